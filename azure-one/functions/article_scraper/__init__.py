@@ -1,29 +1,126 @@
 import azure.functions as func
-import json
 import os
 import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import validate_request
     from ..shared.rate_limiter import DailyRateLimiter
     from ..shared.cache_cleaner import CacheCleaner
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import validate_request
     from shared.rate_limiter import DailyRateLimiter
     from shared.cache_cleaner import CacheCleaner
 
 try:
-    from .scraper import scrape_article
+    from .scraper import scrape_article, extract_shortcode, add_origin_rss
     from .config_loader import load_scraper_config
     from .storage_client import StorageClient
 except ImportError:
-    from article_scraper.scraper import scrape_article
+    from article_scraper.scraper import scrape_article, extract_shortcode, add_origin_rss
     from article_scraper.config_loader import load_scraper_config
     from article_scraper.storage_client import StorageClient
 
 logger = logging.getLogger(__name__)
 
+# Scraping is network-bound, so URLs in one request are fetched concurrently
+MAX_SCRAPE_WORKERS = 10
+
+DAILY_LIMIT = int(os.getenv('ARTICLE_SCRAPER_DAILY_LIMIT', '50'))
+CACHE_TTL_HOURS = int(os.getenv('CACHE_TTL_HOURS', '1'))
+
+# Reused across invocations on a warm instance
+_rate_limiter = None
+_storage_client = None
+_cache_cleaner = None
+_clients_lock = threading.Lock()
+
+
+def _get_rate_limiter() -> DailyRateLimiter:
+    global _rate_limiter
+    with _clients_lock:
+        if _rate_limiter is None:
+            _rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
+        return _rate_limiter
+
+
+def _get_storage_client() -> StorageClient:
+    global _storage_client
+    with _clients_lock:
+        if _storage_client is None:
+            _storage_client = StorageClient()
+        return _storage_client
+
+
+def _get_cache_cleaner() -> CacheCleaner:
+    global _cache_cleaner
+    with _clients_lock:
+        if _cache_cleaner is None:
+            _cache_cleaner = CacheCleaner()
+        return _cache_cleaner
+
+
+def _check_and_increment(rate_limiter: DailyRateLimiter, daily_limit: int) -> bool:
+    try:
+        return rate_limiter.check_and_increment('article_scraper', daily_limit)
+    except Exception as e:
+        # Fail open, as check_limit did: a table outage should not take the endpoint down
+        logger.error(f"Rate limit check failed for article_scraper: {e}")
+        return True
+
+
+def _scrape_url(url: str, config: dict, language_code: str, cache_ttl_hours: int,
+                storage_client: StorageClient, cached_at: dict) -> dict:
+    try:
+        shortcode = extract_shortcode(url)
+        blob_path = f"cache/yle/articles/{shortcode}_{language_code}.json"
+        
+        last_modified = cached_at.get(blob_path)
+        if last_modified and last_modified + timedelta(hours=cache_ttl_hours) > datetime.now(timezone.utc):
+            logger.info(f"Returning cached article: {blob_path}")
+            cached_data = storage_client.get_article(blob_path)
+            if cached_data:
+                return {
+                    "success": True,
+                    "cached": True,
+                    "url": cached_data.get('url', url),
+                    "shortcode": cached_data.get('shortcode', shortcode),
+                    "title": cached_data.get('title', ''),
+                    "paragraphs": cached_data.get('paragraphs', []),
+                    "paragraphs_count": len(cached_data.get('paragraphs', [])),
+                    "blob_path": blob_path,
+                    "scraped_at": cached_data.get('scraped_at'),
+                    "scraper_version": cached_data.get('scraper_version')
+                }
+        
+        article_data = scrape_article(url, config, language_code, cache_ttl_hours)
+        storage_client.save_article(article_data, blob_path)
+        
+        return {
+            "success": True,
+            "cached": False,
+            "url": article_data.get('url', url),
+            "shortcode": article_data.get('shortcode'),
+            "title": article_data.get('title', ''),
+            "paragraphs": article_data.get('paragraphs', []),
+            "paragraphs_count": len(article_data.get('paragraphs', [])),
+            "blob_path": blob_path,
+            "scraped_at": article_data.get('scraped_at'),
+            "scraper_version": article_data.get('scraper_version')
+        }
+    except Exception as e:
+        logger.error(f"Error scraping {url}: {e}", exc_info=True)
+        return {
+            "success": False,
+            "url": url,
+            "error": str(e)
+        }
+
 
 @app.route(route="article-scraper", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET", "POST"])
 def article_scraper(req: func.HttpRequest) -> func.HttpResponse:
@@ -33,29 +130,13 @@ def article_scraper(req: func.HttpRequest) -> func.HttpResponse:
     if not is_valid:
         logger.warning(f"Authentication failed: {username_or_error}")
         return func.HttpResponse(
-            json.dumps({"error": "Authentication required"}),
+            json_dumps({"error": "Authentication required"}),
             status_code=401,
             mimetype="application/json"
         )
     
     username = username_or_error
     
-    rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
-    daily_limit = int(os.getenv('ARTICLE_SCRAPER_DAILY_LIMIT', '50'))
-    
-    if not rate_limiter.check_limit('article_scraper', daily_limit):
-        current_count = rate_limiter.get_daily_count('article_scraper')
-        logger.warning(f"Rate limit exceeded for article_scraper: {current_count}/{daily_limit}")
-        return func.HttpResponse(
-            json.dumps({
-                "error": "Rate limit exceeded",
-                "current_count": current_count,
-                "daily_limit": daily_limit
-            }),
-            status_code=429,
-            mimetype="application/json"
-        )
-    
     try:
         if req.method == 'POST':
             body = req.get_json()
@@ -68,77 +149,57 @@ def article_scraper(req: func.HttpRequest) -> func.HttpResponse:
         
         if not urls:
             return func.HttpResponse(
-                json.dumps({"error": "No URLs provided"}),
+                json_dumps({"error": "No URLs provided"}),
                 status_code=400,
                 mimetype="application/json"
             )
         
+        # Counted per accepted request, before scraping, so a failed scrape still uses quota
+        rate_limiter = _get_rate_limiter()
+        daily_limit = DAILY_LIMIT
+        if not _check_and_increment(rate_limiter, daily_limit):
+            current_count = rate_limiter.get_daily_count('article_scraper')
+            logger.warning(f"Rate limit exceeded for article_scraper: {current_count}/{daily_limit}")
+            return func.HttpResponse(
+                json_dumps({
+                    "error": "Rate limit exceeded",
+                    "current_count": current_count,
+                    "daily_limit": daily_limit
+                }),
+                status_code=429,
+                mimetype="application/json"
+            )
+        
         config = load_scraper_config()
-        storage_client = StorageClient()
-        cache_ttl_hours = int(os.getenv('CACHE_TTL_HOURS', '1'))
-        cache_cleaner = CacheCleaner()
+        storage_client = _get_storage_client()
+        cache_ttl_hours = CACHE_TTL_HOURS
+        cache_cleaner = _get_cache_cleaner()
         
-        cache_cleaner.cleanup_expired('cache/yle/articles/', cache_ttl_hours)
+        cache_cleaner.cleanup_expired_if_due('cache/yle/articles/', cache_ttl_hours)
         
-        results = []
+        # One listing for the whole batch instead of a cache lookup per URL
+        cached_at = storage_client.list_article_timestamps('cache/yle/articles/')
+        
+        # Scrape each distinct URL once; duplicates (including origin=rss variants) share the result
+        unique_urls = {}
         for url in urls:
-            try:
-                try:
-                    from .scraper import extract_shortcode
-                except ImportError:
-                    from article_scraper.scraper import extract_shortcode
-                shortcode = extract_shortcode(url)
-                blob_path = f"cache/yle/articles/{shortcode}_{language_code}.json"
-                
-                if cache_cleaner.check_cache_valid(blob_path, cache_ttl_hours):
-                    logger.info(f"Returning cached article: {blob_path}")
-                    cached_data = storage_client.get_article(blob_path)
-                    if cached_data:
-                        results.append({
-                            "success": True,
-                            "cached": True,
-                            "url": cached_data.get('url', url),
-                            "shortcode": cached_data.get('shortcode', shortcode),
-                            "title": cached_data.get('title', ''),
-                            "paragraphs": cached_data.get('paragraphs', []),
-                            "paragraphs_count": len(cached_data.get('paragraphs', [])),
-                            "blob_path": blob_path,
-                            "scraped_at": cached_data.get('scraped_at'),
-                            "scraper_version": cached_data.get('scraper_version')
-                        })
-                        continue
-                
-                article_data = scrape_article(url, config, language_code, cache_ttl_hours)
-                storage_client.save_article(article_data, blob_path)
-                
-                results.append({
-                    "success": True,
-                    "cached": False,
-                    "url": article_data.get('url', url),
-                    "shortcode": article_data.get('shortcode'),
-                    "title": article_data.get('title', ''),
-                    "paragraphs": article_data.get('paragraphs', []),
-                    "paragraphs_count": len(article_data.get('paragraphs', [])),
-                    "blob_path": blob_path,
-                    "scraped_at": article_data.get('scraped_at'),
-                    "scraper_version": article_data.get('scraper_version')
-                })
-            except Exception as e:
-                logger.error(f"Error scraping {url}: {e}", exc_info=True)
-                results.append({
-                    "success": False,
-                    "url": url,
-                    "error": str(e)
-                })
+            unique_urls.setdefault(add_origin_rss(url), url)
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_SCRAPE_WORKERS, len(unique_urls))) as executor:
+            scraped = dict(zip(unique_urls, executor.map(
+                lambda url: _scrape_url(url, config, language_code, cache_ttl_hours,
+                                        storage_client, cached_at),
+                unique_urls.values()
+            )))
         
-        rate_limiter.increment('article_scraper')
+        results = [scraped[add_origin_rss(url)] for url in urls]
         
         return func.HttpResponse(
-            json.dumps({
+            json_dumps({
                 "success": True,
                 "results": results,
                 "total": len(results),
-                "succeeded": len([r for r in results if r.get('success')])
+                "succeeded": sum(1 for r in results if r.get('success'))
             }),
             status_code=200,
             mimetype="application/json"
@@ -147,7 +208,7 @@ def article_scraper(req: func.HttpRequest) -> func.HttpResponse:
     except Exception as e:
         logger.error(f"Error in article scraper: {e}", exc_info=True)
         return func.HttpResponse(
-            json.dumps({"error": str(e)}),
+            json_dumps({"error": str(e)}),
             status_code=500,
             mimetype="application/json"
         )
@@ -2,10 +2,17 @@ import os
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
+# Parsed configs keyed by path, reused until the file's mtime changes
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
 
 def load_scraper_config() -> Dict[str, Any]:
     use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
@@ -15,15 +22,23 @@ def load_scraper_config() -> Dict[str, Any]:
     else:
         config_path = os.getenv('SCRAPER_CONFIG_PATH', 'scraper-config.yaml')
     
-    if not os.path.exists(config_path):
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except OSError:
         logger.warning(f"Config file not found at {config_path}, using defaults")
         return get_default_config()
     
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YamlLoader)
         logger.info(f"Loaded scraper config from {config_path}")
-        return config.get('scraping', {})
+        scraping = config.get('scraping', {})
+        _CONFIG_CACHE[config_path] = (mtime_ns, scraping)
+        return scraping
     except Exception as e:
         logger.error(f"Error loading config: {e}, using defaults")
         return get_default_config()
@@ -1,20 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import soupsieve
 import logging
+import re
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+try:
+    from ..shared.url_utils import extract_shortcode
+except ImportError:
+    from shared.url_utils import extract_shortcode
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r'\s+')
 
-def extract_shortcode(url: str) -> str:
-    if '/a/' in url:
-        return url.split('/a/')[-1].split('?')[0].split('#')[0]
-    return ''
+# Shared across invocations so keep-alive connections to the news site are reused
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
 
 
+@lru_cache(maxsize=64)
+def _compile_selectors(selectors: Tuple[str, ...]) -> Tuple[soupsieve.SoupSieve, ...]:
+    return tuple(soupsieve.compile(selector) for selector in selectors)
+
+
+@lru_cache(maxsize=64)
+def _compile_combined_selector(selectors: Tuple[str, ...]) -> Optional[soupsieve.SoupSieve]:
+    if not selectors:
+        return None
+    return soupsieve.compile(', '.join(selectors))
+
+
+@lru_cache(maxsize=4096)
 def add_origin_rss(url: str) -> str:
+    if '?' not in url and '#' not in url:
+        return url + '?origin=rss'
+    
     parsed = urlparse(url)
     query_params = parse_qs(parsed.query)
     
@@ -32,29 +61,42 @@ def add_origin_rss(url: str) -> str:
     ))
 
 
-def clean_text(text: str, config: Dict[str, Any]) -> Optional[str]:
-    cleaning = config.get('cleaning', {})
-    
-    if cleaning.get('strip_whitespace', True):
+def _clean(text: str, strip: bool, remove_empty: bool, min_length: int, normalize: bool) -> Optional[str]:
+    if strip:
         text = text.strip()
     
-    if cleaning.get('remove_empty', True) and not text:
+    if remove_empty and not text:
         return None
     
-    min_length = cleaning.get('min_length', 0)
     if len(text) < min_length:
         return None
     
-    if cleaning.get('normalize_spaces', False):
-        import re
-        text = re.sub(r'\s+', ' ', text)
+    if normalize:
+        text = _WHITESPACE_RE.sub(' ', text)
     
     return text
 
 
-def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi', cache_ttl_hours: int = 1) -> Dict[str, Any]:
+def _cleaning_flags(config: Dict[str, Any]) -> Tuple[bool, bool, int, bool]:
+    cleaning = config.get('cleaning', {})
+    return (
+        cleaning.get('strip_whitespace', True),
+        cleaning.get('remove_empty', True),
+        cleaning.get('min_length', 0),
+        cleaning.get('normalize_spaces', False)
+    )
+
+
+def clean_text(text: str, config: Dict[str, Any]) -> Optional[str]:
+    return _clean(text, *_cleaning_flags(config))
+
+
+def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi', cache_ttl_hours: int = 1,
+                   session: Optional[requests.Session] = None) -> Dict[str, Any]:
     logger.info(f"Scraping article from {url}")
     
+    http = session or _SESSION
+    
     request_config = config.get('request', {})
     headers = request_config.get('headers', {})
     timeout = request_config.get('timeout', 30)
@@ -64,7 +106,7 @@ def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi',
         url = add_origin_rss(url)
     
     try:
-        response = requests.get(
+        response = http.get(
             url,
             headers=headers,
             timeout=timeout,
@@ -75,15 +117,20 @@ def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi',
         logger.error(f"Error fetching {url}: {e}")
         raise
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(response.text, 'lxml')
+    
+    selectors = config.get('selectors', {})
     
-    for exclude_selector in config.get('selectors', {}).get('exclude', []):
-        for element in soup.select(exclude_selector):
-            element.decompose()
+    # Excludes are all removed anyway, so one combined selector walks the tree once
+    exclude = _compile_combined_selector(tuple(selectors.get('exclude', [])))
+    if exclude:
+        for element in exclude.select(soup):
+            if not element.decomposed:
+                element.decompose()
     
     title = None
-    for title_selector in config.get('selectors', {}).get('title', []):
-        title_elem = soup.select_one(title_selector)
+    for title_selector in _compile_selectors(tuple(selectors.get('title', []))):
+        title_elem = title_selector.select_one(soup)
         if title_elem:
             title = title_elem.get_text(strip=True)
             break
@@ -93,13 +140,14 @@ def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi',
         if title:
             title = title.get_text(strip=True)
     
+    strip, remove_empty, min_length, normalize = _cleaning_flags(config)
     paragraphs = []
-    for para_selector in config.get('selectors', {}).get('paragraphs', []):
-        para_elems = soup.select(para_selector)
+    for para_selector in _compile_selectors(tuple(selectors.get('paragraphs', []))):
+        para_elems = para_selector.select(soup)
         if para_elems:
             for para_elem in para_elems:
                 text = para_elem.get_text(separator=' ', strip=True)
-                cleaned = clean_text(text, config)
+                cleaned = _clean(text, strip, remove_empty, min_length, normalize)
                 if cleaned:
                     paragraphs.append(cleaned)
             if paragraphs:
@@ -117,6 +165,7 @@ def scrape_article(url: str, config: Dict[str, Any], language_code: str = 'fi',
         'scraped_at': now.isoformat(),
         'scraper_version': '1.0',
         'expires_at': expires_at.isoformat(),
+        'expires_at_epoch': expires_at.timestamp(),
         'cache_ttl_hours': cache_ttl_hours
     }
     
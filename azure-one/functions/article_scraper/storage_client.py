@@ -1,44 +1,61 @@
 import os
 import logging
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
+from azure.storage.blob import ContentSettings
 try:
     from ..shared.storage_factory import get_blob_storage
+    from ..shared.json_utils import json_dumps, json_loads
 except ImportError:
     from shared.storage_factory import get_blob_storage
+    from shared.json_utils import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
+_JSON_CONTENT_SETTINGS = ContentSettings(content_type='application/json; charset=utf-8')
+
 
 class StorageClient:
     def __init__(self):
         self.storage = get_blob_storage()
         self.container_name = os.getenv('STORAGE_CONTAINER', 'finnish-news-tools')
+        self.use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
+        self._container = None
         logger.info(f"Initialized StorageClient with container {self.container_name}")
     
+    def _get_container(self):
+        if self._container is None:
+            self._container = self.storage.get_container_client(self.container_name)
+        return self._container
+    
     def save_article(self, article_data: Dict[str, Any], blob_path: str):
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             self.storage.save_file(blob_path, article_data)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
-            import json
+            metadata = {
+                key: str(article_data[key])
+                for key in ('expires_at', 'expires_at_epoch', 'scraped_at', 'shortcode')
+                if article_data.get(key)
+            }
+            data = json_dumps(article_data)
             blob_client.upload_blob(
-                json.dumps(article_data, indent=2, ensure_ascii=False),
+                data,
                 overwrite=True,
-                encoding='utf-8'
+                length=len(data),
+                max_concurrency=4,
+                content_settings=_JSON_CONTENT_SETTINGS,
+                metadata=metadata
             )
         
         logger.info(f"Saved article to {blob_path}")
     
     def check_article_exists(self, blob_path: str) -> bool:
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             return self.storage.file_exists(blob_path)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
             try:
                 blob_client.get_blob_properties()
@@ -47,32 +64,42 @@ class StorageClient:
                 return False
     
     def get_article(self, blob_path: str) -> Optional[Dict[str, Any]]:
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             return self.storage.read_file(blob_path)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
             try:
-                import json
-                blob_data = blob_client.download_blob().readall()
-                return json.loads(blob_data.decode('utf-8'))
+                blob_data = blob_client.download_blob(max_concurrency=2).readall()
+                return json_loads(blob_data)
             except Exception as e:
                 logger.debug(f"Could not read article from {blob_path}: {e}")
                 return None
     
     def list_articles(self, prefix: str = 'cache/yle/articles/') -> list:
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             files = self.storage.list_files(prefix)
             return [f for f in files if f.endswith('.json')]
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blobs = container.list_blobs(name_starts_with=prefix)
             return [blob.name for blob in blobs if blob.name.endswith('.json')]
     
+    def list_article_timestamps(self, prefix: str = 'cache/yle/articles/') -> Dict[str, datetime]:
+        if self.use_local:
+            timestamps = {}
+            for name in self.list_articles(prefix):
+                try:
+                    mtime = os.stat(self.storage.full_path(name)).st_mtime
+                except OSError:
+                    continue
+                timestamps[name] = datetime.fromtimestamp(mtime, tz=timezone.utc)
+            return timestamps
+        else:
+            container = self._get_container()
+            blobs = container.list_blobs(name_starts_with=prefix)
+            return {blob.name: blob.last_modified for blob in blobs if blob.name.endswith('.json')}
+    
     def get_cache_status(self) -> Dict[str, Any]:
         prefix = 'cache/yle/articles/'
         articles = self.list_articles(prefix)
@@ -3,21 +3,41 @@
 # For production, use authenticate/__init__.py.local with secure validation
 
 import azure.functions as func
-import json
 import os
 import logging
+import threading
 from datetime import datetime, timezone, timedelta
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import generate_token
     from ..shared.rate_limiter import IPRateLimiter, get_client_ip
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import generate_token
     from shared.rate_limiter import IPRateLimiter, get_client_ip
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_WINDOW_MINUTES = int(os.getenv('AUTH_RATE_LIMIT_WINDOW_MINUTES', '15'))
+RATE_LIMIT_PER_WINDOW = int(os.getenv('AUTH_RATE_LIMIT_PER_WINDOW', '5'))
+
+# Reused across invocations on a warm instance
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _get_rate_limiter() -> IPRateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = IPRateLimiter(
+                table_name=os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'),
+                window_minutes=RATE_LIMIT_WINDOW_MINUTES
+            )
+        return _rate_limiter
+
 
 def validate_password(password: str) -> bool:
     return password == "Hello world!"
@@ -29,17 +49,14 @@ def authenticate(req: func.HttpRequest) -> func.HttpResponse:
     
     try:
         client_ip = get_client_ip(req)
-        rate_limiter = IPRateLimiter(
-            table_name=os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'),
-            window_minutes=int(os.getenv('AUTH_RATE_LIMIT_WINDOW_MINUTES', '15'))
-        )
-        rate_limit = int(os.getenv('AUTH_RATE_LIMIT_PER_WINDOW', '5'))
+        rate_limiter = _get_rate_limiter()
+        rate_limit = RATE_LIMIT_PER_WINDOW
         
         if not rate_limiter.check_limit(client_ip, rate_limit):
             current_count = rate_limiter.get_count(client_ip)
             logger.warning(f"Rate limit exceeded for IP {client_ip}: {current_count}/{rate_limit}")
             return func.HttpResponse(
-                json.dumps({
+                json_dumps({
                     "error": "Too many authentication attempts. Please try again later.",
                     "retry_after_minutes": rate_limiter.window_minutes
                 }),
@@ -54,7 +71,7 @@ def authenticate(req: func.HttpRequest) -> func.HttpResponse:
         if not username or not password:
             rate_limiter.increment(client_ip)
             return func.HttpResponse(
-                json.dumps({"error": "Username and password required"}),
+                json_dumps({"error": "Username and password required"}),
                 status_code=400,
                 mimetype="application/json"
             )
@@ -64,7 +81,7 @@ def authenticate(req: func.HttpRequest) -> func.HttpResponse:
         if not validate_password(password):
             logger.warning(f"Authentication failed for user {username} from IP {client_ip}")
             return func.HttpResponse(
-                json.dumps({"error": "Invalid credentials"}),
+                json_dumps({"error": "Invalid credentials"}),
                 status_code=401,
                 mimetype="application/json"
             )
@@ -80,7 +97,7 @@ def authenticate(req: func.HttpRequest) -> func.HttpResponse:
         logger.info(f"Authentication successful for user {username}")
         
         return func.HttpResponse(
-            json.dumps({
+            json_dumps({
                 "success": True,
                 "token": token,
                 "username": username,
@@ -94,7 +111,7 @@ def authenticate(req: func.HttpRequest) -> func.HttpResponse:
     except Exception as e:
         logger.error(f"Error in authenticate function: {e}", exc_info=True)
         return func.HttpResponse(
-            json.dumps({"error": str(e)}),
+            json_dumps({"error": str(e)}),
             status_code=500,
             mimetype="application/json"
         )
@@ -1,18 +1,39 @@
 import azure.functions as func
-import json
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import validate_request
     from ..shared.rate_limiter import DailyRateLimiter
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import validate_request
     from shared.rate_limiter import DailyRateLimiter
 
 logger = logging.getLogger(__name__)
 
+FUNCTIONS_CONFIG = {
+    'rss_feed_parser': int(os.getenv('RSS_PARSER_DAILY_LIMIT', '50')),
+    'article_scraper': int(os.getenv('ARTICLE_SCRAPER_DAILY_LIMIT', '50')),
+    'translate_article': int(os.getenv('TRANSLATION_DAILY_LIMIT', '50'))
+}
+
+# Reused across invocations on a warm instance
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _get_rate_limiter() -> DailyRateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
+        return _rate_limiter
+
 
 @app.route(route="query-rate-limits", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET"])
 def query_rate_limits(req: func.HttpRequest) -> func.HttpResponse:
@@ -22,25 +43,20 @@ def query_rate_limits(req: func.HttpRequest) -> func.HttpResponse:
     if not is_valid:
         logger.warning(f"Authentication failed: {username_or_error}")
         return func.HttpResponse(
-            json.dumps({"error": "Authentication required"}),
+            json_dumps({"error": "Authentication required"}),
             status_code=401,
             mimetype="application/json"
         )
     
     function_name = req.params.get('function_name')
     
-    rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
-    
-    functions_config = {
-        'rss_feed_parser': int(os.getenv('RSS_PARSER_DAILY_LIMIT', '50')),
-        'article_scraper': int(os.getenv('ARTICLE_SCRAPER_DAILY_LIMIT', '50')),
-        'translate_article': int(os.getenv('TRANSLATION_DAILY_LIMIT', '50'))
-    }
+    rate_limiter = _get_rate_limiter()
+    functions_config = FUNCTIONS_CONFIG
     
     if function_name:
         if function_name not in functions_config:
             return func.HttpResponse(
-                json.dumps({"error": f"Unknown function: {function_name}"}),
+                json_dumps({"error": f"Unknown function: {function_name}"}),
                 status_code=400,
                 mimetype="application/json"
             )
@@ -58,16 +74,19 @@ def query_rate_limits(req: func.HttpRequest) -> func.HttpResponse:
         }
         
         return func.HttpResponse(
-            json.dumps(result),
+            json_dumps(result),
             status_code=200,
             mimetype="application/json"
         )
     else:
+        date_key = rate_limiter._get_date_key()
+        with ThreadPoolExecutor(max_workers=len(functions_config)) as executor:
+            counts = executor.map(rate_limiter.get_daily_count, functions_config.keys())
+        
         results = {}
-        for func_name, daily_limit in functions_config.items():
-            current_count = rate_limiter.get_daily_count(func_name)
+        for (func_name, daily_limit), current_count in zip(functions_config.items(), counts):
             results[func_name] = {
-                "date": rate_limiter._get_date_key(),
+                "date": date_key,
                 "request_count": current_count,
                 "daily_limit": daily_limit,
                 "remaining": max(0, daily_limit - current_count),
@@ -75,7 +94,7 @@ def query_rate_limits(req: func.HttpRequest) -> func.HttpResponse:
             }
         
         return func.HttpResponse(
-            json.dumps(results),
+            json_dumps(results),
             status_code=200,
             mimetype="application/json"
         )
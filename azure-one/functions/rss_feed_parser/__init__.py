@@ -1,15 +1,17 @@
 import azure.functions as func
-import json
 import os
 import logging
+import threading
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import validate_request
     from ..shared.rate_limiter import DailyRateLimiter
     from ..shared.cache_cleaner import CacheCleaner
     from ..shared.cors_helper import add_cors_headers, create_cors_response
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import validate_request
     from shared.rate_limiter import DailyRateLimiter
     from shared.cache_cleaner import CacheCleaner
@@ -24,6 +26,50 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+DAILY_LIMIT = int(os.getenv('RSS_PARSER_DAILY_LIMIT', '50'))
+CACHE_TTL_HOURS = int(os.getenv('CACHE_TTL_HOURS', '1'))
+DEFAULT_FEED_URL = os.getenv('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
+ADD_ORIGIN_RSS = os.getenv('ADD_ORIGIN_RSS', 'true').lower() == 'true'
+
+# Reused across invocations on a warm instance
+_rate_limiter = None
+_storage_client = None
+_cache_cleaner = None
+_clients_lock = threading.Lock()
+
+
+def _get_rate_limiter() -> DailyRateLimiter:
+    global _rate_limiter
+    with _clients_lock:
+        if _rate_limiter is None:
+            _rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
+        return _rate_limiter
+
+
+def _get_storage_client() -> StorageClient:
+    global _storage_client
+    with _clients_lock:
+        if _storage_client is None:
+            _storage_client = StorageClient()
+        return _storage_client
+
+
+def _get_cache_cleaner() -> CacheCleaner:
+    global _cache_cleaner
+    with _clients_lock:
+        if _cache_cleaner is None:
+            _cache_cleaner = CacheCleaner()
+        return _cache_cleaner
+
+
+def _check_and_increment(rate_limiter: DailyRateLimiter, daily_limit: int) -> bool:
+    try:
+        return rate_limiter.check_and_increment('rss_feed_parser', daily_limit)
+    except Exception as e:
+        # Fail open, as check_limit did: a table outage should not take the endpoint down
+        logger.error(f"Rate limit check failed for rss_feed_parser: {e}")
+        return True
+
 
 @app.route(route="rss-feed-parser", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET", "POST"])
 def rss_feed_parser(req: func.HttpRequest) -> func.HttpResponse:
@@ -33,7 +79,7 @@ def rss_feed_parser(req: func.HttpRequest) -> func.HttpResponse:
     if not is_valid:
         logger.warning(f"Authentication failed: {username_or_error}")
         return create_cors_response(
-            json.dumps({"error": "Authentication required"}),
+            json_dumps({"error": "Authentication required"}),
             status_code=401,
             mimetype="application/json",
             request=req
@@ -41,56 +87,56 @@ def rss_feed_parser(req: func.HttpRequest) -> func.HttpResponse:
     
     username = username_or_error
     
-    rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
-    daily_limit = int(os.getenv('RSS_PARSER_DAILY_LIMIT', '50'))
-    
-    if not rate_limiter.check_limit('rss_feed_parser', daily_limit):
-        current_count = rate_limiter.get_daily_count('rss_feed_parser')
-        logger.warning(f"Rate limit exceeded for rss_feed_parser: {current_count}/{daily_limit}")
-        return create_cors_response(
-            json.dumps({
-                "error": "Rate limit exceeded",
-                "current_count": current_count,
-                "daily_limit": daily_limit
-            }),
-            status_code=429,
-            mimetype="application/json",
-            request=req
-        )
-    
-    feed_url = req.params.get('url') or os.getenv('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
-    add_origin_rss = os.getenv('ADD_ORIGIN_RSS', 'true').lower() == 'true'
-    cache_ttl_hours = int(os.getenv('CACHE_TTL_HOURS', '1'))
+    feed_url = req.params.get('url') or DEFAULT_FEED_URL
+    add_origin_rss = ADD_ORIGIN_RSS
+    cache_ttl_hours = CACHE_TTL_HOURS
     force_reload = req.params.get('force_reload', 'false').lower() == 'true'
     
-    storage_client = StorageClient()
+    storage_client = _get_storage_client()
     blob_path = 'cache/yle/paauutiset.json'
-    cache_cleaner = CacheCleaner()
+    cache_cleaner = _get_cache_cleaner()
     
-    cache_cleaner.cleanup_expired('cache/yle/', cache_ttl_hours)
+    cache_cleaner.cleanup_expired_if_due('cache/yle/', cache_ttl_hours)
     
     if not force_reload and cache_cleaner.check_cache_valid(blob_path, cache_ttl_hours):
         logger.info("Returning cached RSS feed")
         cached_data = storage_client.get_rss_feed(blob_path)
         if cached_data:
             response = func.HttpResponse(
-                json.dumps(cached_data),
+                json_dumps(cached_data),
                 status_code=200,
                 mimetype="application/json"
             )
             return add_cors_headers(response, req)
     
+    rate_limiter = _get_rate_limiter()
+    daily_limit = DAILY_LIMIT
+    
+    if not _check_and_increment(rate_limiter, daily_limit):
+        current_count = rate_limiter.get_daily_count('rss_feed_parser')
+        logger.warning(f"Rate limit exceeded for rss_feed_parser: {current_count}/{daily_limit}")
+        return create_cors_response(
+            json_dumps({
+                "error": "Rate limit exceeded",
+                "current_count": current_count,
+                "daily_limit": daily_limit
+            }),
+            status_code=429,
+            mimetype="application/json",
+            request=req
+        )
+    
     try:
         feed_data = parse_rss_feed(feed_url, add_origin_rss, cache_ttl_hours)
         
-        storage_client.save_rss_feed(feed_data, blob_path)
-        
-        rate_limiter.increment('rss_feed_parser')
+        # Serialise once; the same bytes are stored and returned
+        body = json_dumps(feed_data)
+        storage_client.save_rss_feed(body, blob_path, metadata=storage_client.cache_metadata(feed_data))
         
         logger.info(f"Fetched and saved RSS feed with {len(feed_data['items'])} items")
         
         response = func.HttpResponse(
-            json.dumps(feed_data),
+            body,
             status_code=200,
             mimetype="application/json"
         )
@@ -99,7 +145,7 @@ def rss_feed_parser(req: func.HttpRequest) -> func.HttpResponse:
     except Exception as e:
         logger.error(f"Error parsing RSS feed: {e}", exc_info=True)
         return create_cors_response(
-            json.dumps({"error": str(e)}),
+            json_dumps({"error": str(e)}),
             status_code=500,
             mimetype="application/json",
             request=req
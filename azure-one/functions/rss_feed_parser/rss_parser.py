@@ -1,19 +1,33 @@
-import feedparser
+import requests
 import logging
+from lxml import etree
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from typing import Dict, List, Any
+try:
+    from ..shared.url_utils import extract_shortcode
+except ImportError:
+    from shared.url_utils import extract_shortcode
 
 logger = logging.getLogger(__name__)
 
+FEED_TIMEOUT_SECONDS = 30
 
-def extract_shortcode(url: str) -> str:
-    if '/a/' in url:
-        return url.split('/a/')[-1].split('?')[0].split('#')[0]
-    return ''
+# Shared across invocations so keep-alive connections to the feed host are reused
+_SESSION = requests.Session()
 
 
+def _text(element, tag: str, default: str = '') -> str:
+    value = element.findtext(tag)
+    return value.strip() if value else default
+
+
+@lru_cache(maxsize=4096)
 def add_origin_rss(url: str) -> str:
+    if '?' not in url and '#' not in url:
+        return url + '?origin=rss'
+    
     parsed = urlparse(url)
     query_params = parse_qs(parsed.query)
     
@@ -33,26 +47,36 @@ def add_origin_rss(url: str) -> str:
 
 def parse_rss_feed(feed_url: str, add_origin_rss_suffix: bool = True, cache_ttl_hours: int = 1) -> Dict[str, Any]:
     logger.info(f"Fetching RSS feed from {feed_url}")
-    feed = feedparser.parse(feed_url)
+    response = _SESSION.get(feed_url, timeout=FEED_TIMEOUT_SECONDS)
+    # feedparser turned HTTP errors into an empty feed that was then cached; now they raise and nothing is stored
+    response.raise_for_status()
+    
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, recover=True)
+    root = etree.fromstring(response.content, parser=parser)
+    if root is None:
+        raise ValueError(f"Could not parse RSS feed from {feed_url}")
+    if parser.error_log:
+        logger.warning(f"Feed parsing warnings: {parser.error_log.last_error}")
     
-    if feed.bozo:
-        logger.warning(f"Feed parsing warnings: {feed.bozo_exception}")
+    channel = root.find('channel')
+    if channel is None:
+        channel = root
     
     now = datetime.now(timezone.utc)
     expires_at = now + timedelta(hours=cache_ttl_hours)
     
     feed_metadata = {
-        'title': feed.feed.get('title', ''),
-        'description': feed.feed.get('description', ''),
-        'link': feed.feed.get('link', ''),
-        'language': feed.feed.get('language', 'fi'),
-        'last_build_date': feed.feed.get('updated', ''),
+        'title': _text(channel, 'title'),
+        'description': _text(channel, 'description'),
+        'link': _text(channel, 'link'),
+        'language': _text(channel, 'language', 'fi'),
+        'last_build_date': _text(channel, 'lastBuildDate'),
         'fetch_timestamp': now.isoformat()
     }
     
     items = []
-    for entry in feed.entries:
-        link = entry.get('link', '')
+    for entry in channel.iterfind('item'):
+        link = _text(entry, 'link')
         
         if add_origin_rss_suffix:
             link = add_origin_rss(link)
@@ -60,12 +84,12 @@ def parse_rss_feed(feed_url: str, add_origin_rss_suffix: bool = True, cache_ttl_
         shortcode = extract_shortcode(link)
         
         item = {
-            'title': entry.get('title', ''),
+            'title': _text(entry, 'title'),
             'link': link,
-            'description': entry.get('description', ''),
-            'guid': entry.get('id', link),
-            'pub_date': entry.get('published', ''),
-            'categories': [cat.get('term', '') for cat in entry.get('tags', [])],
+            'description': _text(entry, 'description'),
+            'guid': _text(entry, 'guid', link),
+            'pub_date': _text(entry, 'pubDate'),
+            'categories': [(category.text or '').strip() for category in entry.iterfind('category')],
             'shortcode': shortcode
         }
         items.append(item)
@@ -74,6 +98,7 @@ def parse_rss_feed(feed_url: str, add_origin_rss_suffix: bool = True, cache_ttl_
         'feed_metadata': feed_metadata,
         'items': items,
         'expires_at': expires_at.isoformat(),
+        'expires_at_epoch': expires_at.timestamp(),
         'cache_ttl_hours': cache_ttl_hours
     }
     
@@ -1,44 +1,72 @@
 import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
+from azure.storage.blob import ContentSettings
 try:
     from ..shared.storage_factory import get_blob_storage
+    from ..shared.json_utils import json_dumps, json_loads
 except ImportError:
     from shared.storage_factory import get_blob_storage
+    from shared.json_utils import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
+_JSON_CONTENT_SETTINGS = ContentSettings(content_type='application/json; charset=utf-8')
+
 
 class StorageClient:
     def __init__(self):
         self.storage = get_blob_storage()
         self.container_name = os.getenv('STORAGE_CONTAINER', 'finnish-news-tools')
+        self.use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
+        self._container = None
         logger.info(f"Initialized StorageClient with container {self.container_name}")
     
-    def save_rss_feed(self, feed_data: Dict[str, Any], blob_path: str):
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
+    def _get_container(self):
+        if self._container is None:
+            self._container = self.storage.get_container_client(self.container_name)
+        return self._container
+    
+    @staticmethod
+    def cache_metadata(feed_data: Dict[str, Any]) -> Dict[str, str]:
+        metadata = {
+            'expires_at': feed_data.get('expires_at'),
+            'expires_at_epoch': feed_data.get('expires_at_epoch'),
+            'fetch_timestamp': feed_data.get('feed_metadata', {}).get('fetch_timestamp')
+        }
+        return {key: str(value) for key, value in metadata.items() if value}
+    
+    def save_rss_feed(self, feed_data: Union[Dict[str, Any], bytes], blob_path: str, *,
+                      already_encoded: bool = False, metadata: Optional[Dict[str, str]] = None):
+        # Callers that already serialised the feed pass the bytes to skip a second encode
+        if already_encoded or isinstance(feed_data, (bytes, bytearray)):
+            data = bytes(feed_data)
+        else:
+            data = json_dumps(feed_data, indent=True)
+            if metadata is None:
+                metadata = self.cache_metadata(feed_data)
         
-        if use_local:
-            self.storage.save_file(blob_path, feed_data)
+        if self.use_local:
+            self.storage.save_file(blob_path, data)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
-            import json
             blob_client.upload_blob(
-                json.dumps(feed_data, indent=2, ensure_ascii=False),
+                data,
                 overwrite=True,
-                encoding='utf-8'
+                length=len(data),
+                max_concurrency=4,
+                content_settings=_JSON_CONTENT_SETTINGS,
+                metadata=metadata
             )
         
         logger.info(f"Saved RSS feed to {blob_path}")
     
     def check_rss_feed_exists(self, blob_path: str) -> bool:
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             return self.storage.file_exists(blob_path)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
             try:
                 blob_client.get_blob_properties()
@@ -47,17 +75,14 @@ class StorageClient:
                 return False
     
     def get_rss_feed(self, blob_path: str) -> Optional[Dict[str, Any]]:
-        use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
-        
-        if use_local:
+        if self.use_local:
             return self.storage.read_file(blob_path)
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
             try:
-                import json
                 blob_data = blob_client.download_blob().readall()
-                return json.loads(blob_data.decode('utf-8'))
+                return json_loads(blob_data)
             except Exception as e:
                 logger.debug(f"Could not read RSS feed from {blob_path}: {e}")
                 return None
@@ -1,133 +1,241 @@
 import os
+import time
+import asyncio
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import List, Optional
-from .storage_factory import get_blob_storage
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from .storage_factory import get_blob_storage, get_async_container_client
+from .json_utils import json_loads
+from .time_utils import parse_iso
 
 logger = logging.getLogger(__name__)
 
+CLEANUP_INTERVAL_SECONDS = int(os.getenv('CACHE_CLEANUP_INTERVAL_SECONDS', '300'))
+
+# Blob Batch API accepts at most 256 sub-requests per call
+DELETE_BATCH_SIZE = 256
+LIST_PAGE_SIZE = 5000
+
+# Expiry checks are one download each, so they are IO-bound and overlap well
+CHECK_WORKERS = 32
+ASYNC_CHECK_CONCURRENCY = 64
+
+
+@lru_cache(maxsize=4096)
+def _parse_epoch(value: str) -> float:
+    return parse_iso(value).timestamp()
+
+
+def _expiry_epoch(values: dict, ttl_seconds: float) -> Optional[float]:
+    # Accepts blob metadata or a parsed cache body; None means no usable timestamp
+    epoch = values.get('expires_at_epoch')
+    if epoch is not None:
+        return float(epoch)
+    
+    if values.get('expires_at'):
+        return _parse_epoch(values['expires_at'])
+    
+    fetch_timestamp = values.get('fetch_timestamp') or (values.get('feed_metadata') or {}).get('fetch_timestamp')
+    timestamp = fetch_timestamp or values.get('scraped_at')
+    if not timestamp:
+        return None
+    return _parse_epoch(timestamp) + ttl_seconds
+
+
+def _is_expired(values: dict, now: float, ttl_seconds: float) -> Optional[bool]:
+    expiry = _expiry_epoch(values, ttl_seconds)
+    if expiry is None:
+        return None
+    return expiry < now
+
+
+@lru_cache(maxsize=1024)
+def _local_expiry(storage, blob_path: str, version, ttl_seconds: float) -> Optional[float]:
+    # Keyed by file version, so a rewrite is a cache miss; only the parsed expiry is kept, never the verdict
+    cache_data = storage.read_file(blob_path)
+    if not cache_data or not isinstance(cache_data, dict):
+        return None
+    return _expiry_epoch(cache_data, ttl_seconds)
+
 
 class CacheCleaner:
-    def __init__(self, container_name: str = None):
-        self.storage = get_blob_storage()
+    def __init__(self, container_name: str = None, storage=None):
+        self.storage = storage or get_blob_storage()
         self.container_name = container_name or os.getenv('STORAGE_CONTAINER', 'finnish-news-tools')
         self.use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
+        self._last_cleanup = {}
+        self._container = None
+    
+    def _get_container(self):
+        if self._container is None:
+            self._container = self.storage.get_container_client(self.container_name)
+        return self._container
+    
+    def cleanup_expired_if_due(self, cache_path: str, ttl_hours: int = 1,
+                               interval_seconds: int = CLEANUP_INTERVAL_SECONDS) -> int:
+        now = time.monotonic()
+        last_run = self._last_cleanup.get(cache_path)
+        if last_run is not None and now - last_run < interval_seconds:
+            return 0
+        self._last_cleanup[cache_path] = now
+        return self.cleanup_expired(cache_path, ttl_hours)
     
     def cleanup_expired(self, cache_path: str, ttl_hours: int = 1) -> int:
         logger.info(f"Cleaning up expired cache entries in {cache_path} (TTL: {ttl_hours}h)")
         cleaned_count = 0
+        now = time.time()
+        ttl_seconds = ttl_hours * 3600
         
         if self.use_local:
-            files = self.storage.list_files(cache_path)
-            for blob_path in files:
+            # Entries are written with the same TTL they are cleaned with, so anything last
+            # modified before the TTL window is expired and can go without being parsed
+            stale_before = now - ttl_seconds
+            for blob_path, mtime, _ in self.storage.iter_prefix(cache_path):
+                if not blob_path.endswith('.json'):
+                    # Only cache entries age out; anything else under the prefix is left alone
+                    continue
                 try:
-                    cache_data = self.storage.read_file(blob_path)
-                    if cache_data and isinstance(cache_data, dict):
-                        if 'expires_at' in cache_data:
-                            expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                            if expires_at < datetime.now(timezone.utc):
-                                self.storage.delete_file(blob_path)
-                                cleaned_count += 1
-                                logger.debug(f"Deleted expired cache: {blob_path}")
-                        else:
-                            if 'fetch_timestamp' in cache_data.get('feed_metadata', {}):
-                                fetch_time = datetime.fromisoformat(
-                                    cache_data['feed_metadata']['fetch_timestamp'].replace('Z', '+00:00')
-                                )
-                            elif 'scraped_at' in cache_data:
-                                fetch_time = datetime.fromisoformat(cache_data['scraped_at'].replace('Z', '+00:00'))
-                            else:
-                                continue
-                            
-                            if fetch_time + timedelta(hours=ttl_hours) < datetime.now(timezone.utc):
-                                self.storage.delete_file(blob_path)
-                                cleaned_count += 1
-                                logger.debug(f"Deleted expired cache (by timestamp): {blob_path}")
+                    if mtime < stale_before:
+                        expired = True
+                    else:
+                        cache_data = self.storage.read_file(blob_path)
+                        expired = isinstance(cache_data, dict) and _is_expired(cache_data, now, ttl_seconds)
+                    
+                    if expired:
+                        self.storage.delete_file(blob_path)
+                        cleaned_count += 1
+                        logger.debug(f"Deleted expired cache: {blob_path}")
                 except Exception as e:
                     logger.warning(f"Error checking cache expiration for {blob_path}: {e}")
         else:
-            container = self.storage.get_container_client(self.container_name)
-            blobs = container.list_blobs(name_starts_with=cache_path)
+            container = self._get_container()
+            blobs = container.list_blobs(
+                name_starts_with=cache_path,
+                include=['metadata'],
+                results_per_page=LIST_PAGE_SIZE
+            )
+            expired = []
             
-            for blob in blobs:
+            with ThreadPoolExecutor(max_workers=CHECK_WORKERS) as executor:
+                checked = executor.map(
+                    lambda blob: self._expired_blob_name(container, blob, now, ttl_seconds),
+                    blobs
+                )
+                for blob_name in checked:
+                    if blob_name is None:
+                        continue
+                    expired.append(blob_name)
+                    if len(expired) >= DELETE_BATCH_SIZE:
+                        cleaned_count += self._delete_batch(container, expired)
+                        expired = []
+            
+            if expired:
+                cleaned_count += self._delete_batch(container, expired)
+        
+        if cleaned_count > 0:
+            logger.info(f"Cleaned up {cleaned_count} expired cache entries")
+        return cleaned_count
+    
+    async def cleanup_expired_async(self, cache_path: str, ttl_hours: int = 1,
+                                    max_concurrency: int = ASYNC_CHECK_CONCURRENCY) -> int:
+        if self.use_local:
+            return self.cleanup_expired(cache_path, ttl_hours)
+        
+        logger.info(f"Cleaning up expired cache entries in {cache_path} (TTL: {ttl_hours}h, async)")
+        now = time.time()
+        ttl_seconds = ttl_hours * 3600
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async with get_async_container_client(self.container_name) as container:
+            async def check(blob) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        expired = _is_expired(blob.metadata or {}, now, ttl_seconds)
+                        if expired is None:
+                            downloader = await container.download_blob(blob.name)
+                            expired = _is_expired(json_loads(await downloader.readall()), now, ttl_seconds)
+                        return blob.name if expired else None
+                    except Exception as e:
+                        logger.warning(f"Error checking cache expiration for {blob.name}: {e}")
+                        return None
+            
+            tasks = [
+                asyncio.create_task(check(blob))
+                async for blob in container.list_blobs(
+                    name_starts_with=cache_path,
+                    include=['metadata'],
+                    results_per_page=LIST_PAGE_SIZE
+                )
+            ]
+            expired = [name for name in await asyncio.gather(*tasks) if name]
+            
+            cleaned_count = 0
+            for start in range(0, len(expired), DELETE_BATCH_SIZE):
+                batch = expired[start:start + DELETE_BATCH_SIZE]
                 try:
-                    blob_client = container.get_blob_client(blob.name)
-                    import json
-                    blob_data = blob_client.download_blob().readall()
-                    cache_data = json.loads(blob_data.decode('utf-8'))
-                    
-                    if 'expires_at' in cache_data:
-                        expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                        if expires_at < datetime.now(timezone.utc):
-                            blob_client.delete_blob()
-                            cleaned_count += 1
-                            logger.debug(f"Deleted expired cache: {blob.name}")
-                    else:
-                        if 'fetch_timestamp' in cache_data.get('feed_metadata', {}):
-                            fetch_time = datetime.fromisoformat(
-                                cache_data['feed_metadata']['fetch_timestamp'].replace('Z', '+00:00')
-                            )
-                        elif 'scraped_at' in cache_data:
-                            fetch_time = datetime.fromisoformat(cache_data['scraped_at'].replace('Z', '+00:00'))
-                        else:
-                            continue
-                        
-                        if fetch_time + timedelta(hours=ttl_hours) < datetime.now(timezone.utc):
-                            blob_client.delete_blob()
-                            cleaned_count += 1
-                            logger.debug(f"Deleted expired cache (by timestamp): {blob.name}")
+                    responses = await container.delete_blobs(*batch, raise_on_any_failure=False)
+                    cleaned_count += sum([1 async for response in responses if response.status_code < 300])
                 except Exception as e:
-                    logger.warning(f"Error checking cache expiration for {blob.name}: {e}")
+                    logger.warning(f"Error deleting expired cache batch of {len(batch)} blobs: {e}")
         
         if cleaned_count > 0:
             logger.info(f"Cleaned up {cleaned_count} expired cache entries")
         return cleaned_count
     
+    def _expired_blob_name(self, container, blob, now: float, ttl_seconds: float) -> Optional[str]:
+        try:
+            # The listing carries metadata; only older blobs written without it need the body
+            expired = _is_expired(blob.metadata or {}, now, ttl_seconds)
+            if expired is None:
+                blob_data = container.get_blob_client(blob.name).download_blob().readall()
+                expired = _is_expired(json_loads(blob_data), now, ttl_seconds)
+            return blob.name if expired else None
+        except Exception as e:
+            logger.warning(f"Error checking cache expiration for {blob.name}: {e}")
+            return None
+    
+    def _delete_batch(self, container, blob_names: List[str]) -> int:
+        try:
+            responses = container.delete_blobs(*blob_names, raise_on_any_failure=False)
+            deleted = sum(1 for response in responses if response.status_code < 300)
+        except Exception as e:
+            logger.warning(f"Error deleting expired cache batch of {len(blob_names)} blobs: {e}")
+            return 0
+        
+        logger.debug(f"Deleted {deleted}/{len(blob_names)} expired cache blobs in one batch")
+        return deleted
+    
     def check_cache_valid(self, blob_path: str, ttl_hours: int = 1) -> bool:
+        ttl_seconds = ttl_hours * 3600
+        
         if self.use_local:
-            if not self.storage.file_exists(blob_path):
+            version = self.storage.file_version(blob_path)
+            if version is None:
                 return False
             
-            cache_data = self.storage.read_file(blob_path)
-            if not cache_data or not isinstance(cache_data, dict):
-                return False
-            
-            if 'expires_at' in cache_data:
-                expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                return expires_at > datetime.now(timezone.utc)
-            else:
-                if 'fetch_timestamp' in cache_data.get('feed_metadata', {}):
-                    fetch_time = datetime.fromisoformat(
-                        cache_data['feed_metadata']['fetch_timestamp'].replace('Z', '+00:00')
-                    )
-                elif 'scraped_at' in cache_data:
-                    fetch_time = datetime.fromisoformat(cache_data['scraped_at'].replace('Z', '+00:00'))
-                else:
-                    return False
-                
-                return fetch_time + timedelta(hours=ttl_hours) > datetime.now(timezone.utc)
+            expiry = _local_expiry(self.storage, blob_path, version, ttl_seconds)
+            return expiry is not None and time.time() < expiry
         else:
-            container = self.storage.get_container_client(self.container_name)
+            container = self._get_container()
             blob_client = container.get_blob_client(blob_path)
             
             try:
-                import json
-                blob_data = blob_client.download_blob().readall()
-                cache_data = json.loads(blob_data.decode('utf-8'))
+                # Properties are a HEAD request; only older blobs without metadata need the body
+                expiry = _expiry_epoch(blob_client.get_blob_properties().metadata or {}, ttl_seconds)
+                if expiry is None:
+                    blob_data = blob_client.download_blob().readall()
+                    expiry = _expiry_epoch(json_loads(blob_data), ttl_seconds)
                 
-                if 'expires_at' in cache_data:
-                    expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                    return expires_at > datetime.now(timezone.utc)
-                else:
-                    if 'fetch_timestamp' in cache_data.get('feed_metadata', {}):
-                        fetch_time = datetime.fromisoformat(
-                            cache_data['feed_metadata']['fetch_timestamp'].replace('Z', '+00:00')
-                        )
-                    elif 'scraped_at' in cache_data:
-                        fetch_time = datetime.fromisoformat(cache_data['scraped_at'].replace('Z', '+00:00'))
-                    else:
-                        return False
-                    
-                    return fetch_time + timedelta(hours=ttl_hours) > datetime.now(timezone.utc)
+                return expiry is not None and time.time() < expiry
             except Exception:
                 return False
+    
+    def check_cache_valid_many(self, blob_paths: Iterable[str], ttl_hours: int = 1) -> Dict[str, bool]:
+        blob_paths = list(blob_paths)
+        if not blob_paths:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(CHECK_WORKERS, len(blob_paths))) as executor:
+            results = executor.map(lambda path: self.check_cache_valid(path, ttl_hours), blob_paths)
+            return dict(zip(blob_paths, results))
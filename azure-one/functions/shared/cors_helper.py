@@ -1,8 +1,16 @@
 import azure.functions as func
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Union
 
+_CORS_STATIC = {
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS, HEAD',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Token, X-Username, X-Issued-Date, Authorization',
+    'Access-Control-Allow-Credentials': 'false'
+}
 
+
+@lru_cache(maxsize=1)
 def get_cors_origin() -> Optional[str]:
     """Get the allowed CORS origin from environment or request headers."""
     # In production, Azure Functions CORS is configured at app level
@@ -25,15 +33,13 @@ def add_cors_headers(response: func.HttpResponse, request: func.HttpRequest) ->
     
     # Add CORS headers
     response.headers['Access-Control-Allow-Origin'] = allowed_origin
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS, HEAD'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Token, X-Username, X-Issued-Date, Authorization'
-    response.headers['Access-Control-Allow-Credentials'] = 'false'
+    response.headers.update(_CORS_STATIC)
     
     return response
 
 
 def create_cors_response(
-    body: str,
+    body: Union[str, bytes],
     status_code: int,
     mimetype: str = "application/json",
     request: Optional[func.HttpRequest] = None
@@ -1,7 +1,15 @@
-import json
+import os
+import shutil
 import logging
+import sqlite3
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List, Union
+from typing import Iterator, Optional, List, Tuple, Union
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import UpdateMode
+from .json_utils import json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -10,100 +18,185 @@ class LocalBlobStorage:
     def __init__(self, base_path: str):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        # Hot paths join plain strings rather than building a Path per call
+        self._base_str = str(self.base_path)
         logger.info(f"Initialized LocalBlobStorage at {self.base_path}")
     
+    def full_path(self, blob_path: str) -> str:
+        return os.path.join(self._base_str, blob_path)
+    
     def save_file(self, blob_path: str, content: Union[bytes, dict, str]):
-        file_path = self.base_path / blob_path
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path = self.full_path(blob_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
         if isinstance(content, dict):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(content, f, indent=2, ensure_ascii=False)
+            data = json_dumps(content)
         elif isinstance(content, str):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data = content.encode('utf-8')
         else:
-            with open(file_path, 'wb') as f:
-                f.write(content)
+            data = content
+        
+        # Write beside the target and swap it in, so readers never see a half-written file
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
         
         logger.debug(f"Saved file: {blob_path}")
     
     def read_file(self, blob_path: str) -> Optional[Union[bytes, dict]]:
-        file_path = self.base_path / blob_path
-        if not file_path.exists():
+        try:
+            with open(self.full_path(blob_path), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
             return None
         
-        if file_path.suffix == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            with open(file_path, 'rb') as f:
-                return f.read()
+        if blob_path.endswith('.json'):
+            return json_loads(data)
+        return data
     
     def file_exists(self, blob_path: str) -> bool:
-        file_path = self.base_path / blob_path
-        return file_path.exists()
+        return os.path.exists(self.full_path(blob_path))
     
-    def list_files(self, prefix: str) -> List[str]:
-        prefix_path = self.base_path / prefix
-        if not prefix_path.exists():
-            return []
-        
-        files = []
-        for file_path in prefix_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(self.base_path)
-                files.append(str(relative_path).replace('\\', '/'))
+    def file_version(self, blob_path: str) -> Optional[Tuple[int, int]]:
+        # save_file swaps in a fresh inode, so (inode, mtime) changes on every write even within one mtime tick
+        try:
+            stat = os.stat(self.full_path(blob_path))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def clear_all(self):
+        shutil.rmtree(self._base_str, ignore_errors=True)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+    
+    def _scan(self, prefix: str) -> Iterator[os.DirEntry]:
+        prefix_path = self.full_path(prefix)
+        if not os.path.isdir(prefix_path):
+            return
         
-        return files
+        # scandir entries carry their file type, so this avoids a stat() per file that rglob + is_file() costs
+        stack = [prefix_path]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+    
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self._base_str).replace('\\', '/')
+    
+    def list_files(self, prefix: str, max_results: Optional[int] = None) -> List[str]:
+        # _scan is lazy, so a capped listing stops walking the tree once it has enough
+        return [self._relative(entry.path) for entry in islice(self._scan(prefix), max_results)]
+    
+    def iter_prefix(self, prefix: str) -> Iterator[Tuple[str, float, int]]:
+        for entry in self._scan(prefix):
+            stat = entry.stat(follow_symlinks=False)
+            yield self._relative(entry.path), stat.st_mtime, stat.st_size
+    
+    def list_prefixes(self, prefix: str) -> List[str]:
+        # Immediate sub-prefixes only, like walk_blobs with a '/' delimiter
+        try:
+            with os.scandir(self.full_path(prefix)) as entries:
+                return [f"{prefix}{entry.name}/" for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return []
     
     def delete_file(self, blob_path: str):
-        file_path = self.base_path / blob_path
-        if file_path.exists():
-            file_path.unlink()
-            logger.debug(f"Deleted file: {blob_path}")
+        try:
+            os.remove(self.full_path(blob_path))
+        except FileNotFoundError:
+            return
+        logger.debug(f"Deleted file: {blob_path}")
+    
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = sum(1 for _ in self._scan(prefix))
+        shutil.rmtree(self.full_path(prefix), ignore_errors=True)
+        logger.debug(f"Deleted {deleted} files under {prefix}")
+        return deleted
+
+
+class _LocalEntity(dict):
+    # Mirrors azure.data.tables.TableEntity, which exposes the ETag via .metadata
+    def __init__(self, data: dict, etag: str):
+        super().__init__(data)
+        self.metadata = {'etag': etag}
 
 
 class LocalTableStorage:
     def __init__(self, table_file_path: str):
         self.table_file_path = Path(table_file_path)
         self.table_file_path.parent.mkdir(parents=True, exist_ok=True)
-        self._load_table()
+        self._conn = None
+        self._lock = threading.Lock()
     
-    def _load_table(self):
-        if self.table_file_path.exists():
-            with open(self.table_file_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-        else:
-            self.data = {}
-    
-    def _save_table(self):
-        with open(self.table_file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Autocommit + WAL: each write is a single-row transaction and readers are not blocked
+            conn = sqlite3.connect(str(self.table_file_path), isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entities ('
+                'partition_key TEXT NOT NULL, row_key TEXT NOT NULL, '
+                'data BLOB NOT NULL, version INTEGER NOT NULL DEFAULT 1, '
+                'PRIMARY KEY (partition_key, row_key))'
+            )
+            self._conn = conn
+        return self._conn
     
     def get_entity(self, partition_key: str, row_key: str) -> Optional[dict]:
-        table_name = self.table_file_path.stem
-        if table_name not in self.data:
-            return None
-        if partition_key not in self.data[table_name]:
-            return None
-        return self.data[table_name][partition_key].get(row_key)
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT data, version FROM entities WHERE partition_key = ? AND row_key = ?',
+                (partition_key, row_key)
+            ).fetchone()
+        return _LocalEntity(json_loads(row[0]), str(row[1])) if row else None
     
     def create_entity(self, entity: dict):
-        table_name = self.table_file_path.stem
-        partition_key = entity['PartitionKey']
-        row_key = entity['RowKey']
+        try:
+            with self._lock:
+                self._connect().execute(
+                    'INSERT INTO entities (partition_key, row_key, data) VALUES (?, ?, ?)',
+                    (entity['PartitionKey'], entity['RowKey'], json_dumps(dict(entity)))
+                )
+        except sqlite3.IntegrityError:
+            raise ResourceExistsError(f"Entity {entity['PartitionKey']}/{entity['RowKey']} already exists")
+    
+    def update_entity(self, entity: dict, mode=UpdateMode.MERGE, etag=None, match_condition=None):
+        partition_key, row_key = entity['PartitionKey'], entity['RowKey']
+        check_etag = etag is not None and match_condition == MatchConditions.IfNotModified
         
-        if table_name not in self.data:
-            self.data[table_name] = {}
-        if partition_key not in self.data[table_name]:
-            self.data[table_name][partition_key] = {}
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT data, version FROM entities WHERE partition_key = ? AND row_key = ?',
+                (partition_key, row_key)
+            ).fetchone()
+            if row is None:
+                raise ResourceNotFoundError(f"Entity {partition_key}/{row_key} not found")
+            if check_etag and str(row[1]) != str(etag):
+                raise ResourceModifiedError(f"Entity {partition_key}/{row_key} was modified")
+            
+            # MERGE keeps stored properties the caller did not send, like the table service does
+            data = {**json_loads(row[0]), **entity} if mode == UpdateMode.MERGE else dict(entity)
+            updated = conn.execute(
+                'UPDATE entities SET data = ?, version = version + 1 '
+                'WHERE partition_key = ? AND row_key = ? AND version = ?',
+                (json_dumps(data), partition_key, row_key, row[1])
+            ).rowcount
         
-        self.data[table_name][partition_key][row_key] = entity
-        self._save_table()
-    
-    def update_entity(self, entity: dict):
-        self.create_entity(entity)
+        # The lock only covers this process; another one sharing the file can still win in between
+        if not updated:
+            raise ResourceModifiedError(f"Entity {partition_key}/{row_key} was modified")
     
     def upsert_entity(self, entity: dict):
-        self.create_entity(entity)
+        with self._lock:
+            self._connect().execute(
+                'INSERT INTO entities (partition_key, row_key, data) VALUES (?, ?, ?) '
+                'ON CONFLICT (partition_key, row_key) DO UPDATE SET data = excluded.data, version = version + 1',
+                (entity['PartitionKey'], entity['RowKey'], json_dumps(dict(entity)))
+            )
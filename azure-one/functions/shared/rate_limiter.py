@@ -1,24 +1,94 @@
 import os
+import time
 import logging
+import threading
 from datetime import datetime, timezone, timedelta
 from typing import Optional
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import UpdateMode
 from .storage_factory import get_table_storage
 
 logger = logging.getLogger(__name__)
 
+# Table clients shared by every limiter in this worker, keyed by table name
+_TABLE_CLIENTS = {}
+_TABLE_CLIENTS_LOCK = threading.Lock()
 
-def get_client_ip(request) -> str:
-    x_forwarded_for = request.headers.get('X-Forwarded-For', '')
-    if x_forwarded_for:
-        return x_forwarded_for.split(',')[0].strip()
+
+def _get_table_client(table_name: str):
+    with _TABLE_CLIENTS_LOCK:
+        table_client = _TABLE_CLIENTS.get(table_name)
+        if table_client is None:
+            table_client = get_table_storage(table_name)
+            _TABLE_CLIENTS[table_name] = table_client
+        return table_client
+
+
+MAX_UPDATE_ATTEMPTS = 5
+
+
+def _read_entity(table_client, partition_key: str, row_key: str) -> Optional[dict]:
+    try:
+        return table_client.get_entity(partition_key=partition_key, row_key=row_key)
+    except ResourceNotFoundError:
+        return None
+
+
+def _conditional_increment(table_client, partition_key: str, row_key: str, fields: dict,
+                           limit: Optional[int] = None) -> Optional[int]:
+    now_iso = datetime.now(timezone.utc).isoformat()
     
-    x_real_ip = request.headers.get('X-Real-Ip', '')
-    if x_real_ip:
-        return x_real_ip
+    # Optimistic concurrency: the update only lands if nobody changed the row since we read it
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        entity = _read_entity(table_client, partition_key, row_key)
+        
+        if entity is None:
+            if limit is not None and limit <= 0:
+                return None
+            try:
+                table_client.create_entity({
+                    'PartitionKey': partition_key,
+                    'RowKey': row_key,
+                    **fields,
+                    'request_count': 1,
+                    'last_updated': now_iso
+                })
+                return 1
+            except ResourceExistsError:
+                continue
+        
+        request_count = entity.get('request_count', 0)
+        if limit is not None and request_count >= limit:
+            return None
+        
+        entity['request_count'] = request_count + 1
+        entity['last_updated'] = now_iso
+        try:
+            table_client.update_entity(
+                entity,
+                mode=UpdateMode.MERGE,
+                etag=getattr(entity, 'metadata', {}).get('etag'),
+                match_condition=MatchConditions.IfNotModified
+            )
+            return request_count + 1
+        except ResourceModifiedError:
+            continue
     
-    client_ip = request.headers.get('X-Client-Ip', '')
-    if client_ip:
-        return client_ip
+    raise RuntimeError(f"Could not update {partition_key}/{row_key} after {MAX_UPDATE_ATTEMPTS} attempts")
+
+
+_IP_HEADERS = ('X-Forwarded-For', 'X-Real-Ip', 'X-Client-Ip')
+
+
+def get_client_ip(request) -> str:
+    get_header = request.headers.get
+    for header in _IP_HEADERS:
+        value = get_header(header)
+        if value:
+            # Proxies append to X-Forwarded-For, so the first entry is the original client
+            first, _, _ = value.partition(',')
+            return first.strip()
     
     return 'unknown'
 
@@ -26,14 +96,25 @@ def get_client_ip(request) -> str:
 class IPRateLimiter:
     def __init__(self, table_name: str, window_minutes: int = 15):
         self.table_name = table_name
-        self.table_client = get_table_storage(table_name)
+        self.table_client = _get_table_client(table_name)
         self.window_minutes = window_minutes
+        self._window = ('', 0.0)
         logger.info(f"Initialized IPRateLimiter with table {table_name}, window={window_minutes}min")
     
     def _get_time_window_key(self) -> str:
-        now = datetime.now(timezone.utc)
-        window_start = now.replace(minute=(now.minute // self.window_minutes) * self.window_minutes, second=0, microsecond=0)
-        return window_start.strftime("%Y-%m-%dT%H:%M")
+        # Key is recomputed only when the wall clock crosses into the next window
+        window_key, window_end = self._window
+        now = time.time()
+        if now < window_end:
+            return window_key
+        
+        # Windows restart at the top of every hour, matching the original minute-based bucketing
+        window_seconds = self.window_minutes * 60
+        hour_start = int(now) - int(now) % 3600
+        window_start = hour_start + (int(now) - hour_start) // window_seconds * window_seconds
+        window_key = datetime.fromtimestamp(window_start, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M")
+        self._window = (window_key, min(window_start + window_seconds, hour_start + 3600))
+        return window_key
     
     def _get_row_key(self, ip_address: str) -> str:
         window_key = self._get_time_window_key()
@@ -70,33 +151,15 @@ class IPRateLimiter:
             return 0
     
     def increment(self, ip_address: str):
-        row_key = self._get_row_key(ip_address)
         window_key = self._get_time_window_key()
+        row_key = f"{ip_address}_{window_key}"
+        fields = {
+            'ip_address': ip_address,
+            'window': window_key
+        }
         
         try:
-            try:
-                entity = self.table_client.get_entity(
-                    partition_key="auth_rate_limits",
-                    row_key=row_key
-                )
-                request_count = entity.get('request_count', 0) + 1
-            except Exception:
-                request_count = 1
-            
-            entity = {
-                'PartitionKey': 'auth_rate_limits',
-                'RowKey': row_key,
-                'ip_address': ip_address,
-                'window': window_key,
-                'request_count': request_count,
-                'last_updated': datetime.now(timezone.utc).isoformat()
-            }
-            
-            if hasattr(self.table_client, 'upsert_entity'):
-                self.table_client.upsert_entity(entity)
-            else:
-                self.table_client.create_entity(entity)
-            
+            request_count = _conditional_increment(self.table_client, "auth_rate_limits", row_key, fields)
             logger.debug(f"Incremented rate limit for IP {ip_address}: {request_count}")
         except Exception as e:
             logger.error(f"Error incrementing rate limit: {e}")
@@ -105,11 +168,20 @@ class IPRateLimiter:
 class DailyRateLimiter:
     def __init__(self, table_name: str):
         self.table_name = table_name
-        self.table_client = get_table_storage(table_name)
+        self.table_client = _get_table_client(table_name)
+        self._date = ('', 0.0)
         logger.info(f"Initialized DailyRateLimiter with table {table_name}")
     
     def _get_date_key(self) -> str:
-        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        date_key, day_end = self._date
+        now = time.time()
+        if now < day_end:
+            return date_key
+        
+        day_start = int(now) - int(now) % 86400
+        date_key = datetime.fromtimestamp(day_start, tz=timezone.utc).strftime("%Y-%m-%d")
+        self._date = (date_key, day_start + 86400)
+        return date_key
     
     def _get_row_key(self, function_name: str) -> str:
         date_key = self._get_date_key()
@@ -119,18 +191,11 @@ class DailyRateLimiter:
         row_key = self._get_row_key(function_name)
         
         try:
-            if hasattr(self.table_client, 'get_entity'):
-                entity = self.table_client.get_entity(
-                    partition_key="rate_limits",
-                    row_key=row_key
-                )
-                request_count = entity.get('request_count', 0)
-            else:
-                entity = self.table_client.get_entity(
-                    partition_key="rate_limits",
-                    row_key=row_key
-                )
-                request_count = entity.get('request_count', 0)
+            entity = self.table_client.get_entity(
+                partition_key="rate_limits",
+                row_key=row_key
+            )
+            request_count = entity.get('request_count', 0)
             
             if request_count >= daily_limit:
                 logger.warning(f"Rate limit exceeded for {function_name}: {request_count}/{daily_limit}")
@@ -141,75 +206,95 @@ class DailyRateLimiter:
             logger.debug(f"No existing rate limit entry for {function_name}: {e}")
             return True
     
+    def check_and_increment(self, function_name: str, daily_limit: int) -> bool:
+        row_key = self._get_row_key(function_name)
+        fields = {
+            'function_name': function_name,
+            'date': self._get_date_key()
+        }
+        
+        request_count = _conditional_increment(self.table_client, "rate_limits", row_key, fields, daily_limit)
+        if request_count is None:
+            logger.warning(f"Rate limit exceeded for {function_name}: limit {daily_limit}")
+            return False
+        
+        logger.debug(f"Incremented rate limit for {function_name}: {request_count}")
+        return True
+    
     def get_daily_count(self, function_name: str) -> int:
         row_key = self._get_row_key(function_name)
         
         try:
-            if hasattr(self.table_client, 'get_entity'):
-                entity = self.table_client.get_entity(
-                    partition_key="rate_limits",
-                    row_key=row_key
-                )
-                return entity.get('request_count', 0)
-            else:
-                entity = self.table_client.get_entity(
-                    partition_key="rate_limits",
-                    row_key=row_key
-                )
-                return entity.get('request_count', 0)
+            entity = self.table_client.get_entity(
+                partition_key="rate_limits",
+                row_key=row_key
+            )
+            return entity.get('request_count', 0)
         except Exception:
             return 0
     
     def increment(self, function_name: str):
-        row_key = self._get_row_key(function_name)
         date_key = self._get_date_key()
+        row_key = f"{function_name}_{date_key}"
+        fields = {
+            'function_name': function_name,
+            'date': date_key
+        }
         
         try:
-            if hasattr(self.table_client, 'get_entity'):
-                try:
-                    entity = self.table_client.get_entity(
-                        partition_key="rate_limits",
-                        row_key=row_key
-                    )
-                    request_count = entity.get('request_count', 0) + 1
-                except Exception:
-                    request_count = 1
-                
-                entity = {
-                    'PartitionKey': 'rate_limits',
-                    'RowKey': row_key,
-                    'function_name': function_name,
-                    'date': date_key,
-                    'request_count': request_count,
-                    'last_updated': datetime.now(timezone.utc).isoformat()
-                }
-                
-                if hasattr(self.table_client, 'upsert_entity'):
-                    self.table_client.upsert_entity(entity)
-                else:
-                    self.table_client.create_entity(entity)
-            else:
-                try:
-                    entity = self.table_client.get_entity(
-                        partition_key="rate_limits",
-                        row_key=row_key
-                    )
-                    request_count = entity.get('request_count', 0) + 1
-                except Exception:
-                    request_count = 1
-                
-                entity = {
-                    'PartitionKey': 'rate_limits',
-                    'RowKey': row_key,
-                    'function_name': function_name,
-                    'date': date_key,
-                    'request_count': request_count,
-                    'last_updated': datetime.now(timezone.utc).isoformat()
-                }
-                
-                self.table_client.upsert_entity(entity)
-            
+            request_count = _conditional_increment(self.table_client, "rate_limits", row_key, fields)
             logger.debug(f"Incremented rate limit for {function_name}: {request_count}")
         except Exception as e:
             logger.error(f"Error incrementing rate limit: {e}")
             raise
+
+
+LOCAL_SYNC_SECONDS = 30
+LOCAL_SAFETY_MARGIN = 5
+
+
+class CachedRateLimiter:
+    # Answers check_limit from a per-process count while it is fresh and well under the limit;
+    # near the limit, or once the count is stale, the table is read again
+    def __init__(self, limiter: DailyRateLimiter, sync_seconds: int = LOCAL_SYNC_SECONDS,
+                 safety_margin: int = LOCAL_SAFETY_MARGIN):
+        self.limiter = limiter
+        self.sync_seconds = sync_seconds
+        self.safety_margin = safety_margin
+        self._counts = {}
+        self._lock = threading.Lock()
+    
+    def _store(self, function_name: str, date_key: str, count: int):
+        with self._lock:
+            self._counts[function_name] = (date_key, count, time.monotonic())
+    
+    def check_limit(self, function_name: str, daily_limit: int) -> bool:
+        date_key = self.limiter._get_date_key()
+        with self._lock:
+            cached = self._counts.get(function_name)
+        if cached is not None:
+            cached_date, count, last_sync = cached
+            if (cached_date == date_key and time.monotonic() - last_sync < self.sync_seconds
+                    and count < daily_limit - self.safety_margin):
+                return True
+        
+        count = self.limiter.get_daily_count(function_name)
+        self._store(function_name, date_key, count)
+        if count >= daily_limit:
+            logger.warning(f"Rate limit exceeded for {function_name}: {count}/{daily_limit}")
+            return False
+        return True
+    
+    def get_daily_count(self, function_name: str) -> int:
+        count = self.limiter.get_daily_count(function_name)
+        self._store(function_name, self.limiter._get_date_key(), count)
+        return count
+    
+    def increment(self, function_name: str):
+        self.limiter.increment(function_name)
+        date_key = self.limiter._get_date_key()
+        with self._lock:
+            cached = self._counts.get(function_name)
+            if cached is not None and cached[0] == date_key:
+                # Bump the local count but keep the sync time, so other instances' increments are still picked up
+                self._counts[function_name] = (date_key, cached[1] + 1, cached[2])
@@ -1,26 +1,78 @@
 import os
 import logging
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient
 from azure.data.tables import TableServiceClient
 from .local_storage import LocalBlobStorage, LocalTableStorage
 
 logger = logging.getLogger(__name__)
 
+# Large enough for the cache cleaner's worker pool to keep its connections alive
+CONNECTION_POOL_SIZE = 32
+
+
+def _pooled_transport() -> RequestsTransport:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=CONNECTION_POOL_SIZE, pool_maxsize=CONNECTION_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return RequestsTransport(session=session, session_owner=False)
+
+
+# Service clients are cached per connection string so warm invocations reuse their HTTP connections
+@lru_cache(maxsize=4)
+def _blob_service_client(connection_string: str) -> BlobServiceClient:
+    logger.info("Using Azure Blob Storage")
+    return BlobServiceClient.from_connection_string(
+        connection_string,
+        transport=_pooled_transport(),
+        connection_timeout=20,
+        read_timeout=60
+    )
+
+
+@lru_cache(maxsize=4)
+def _table_service_client(connection_string: str) -> TableServiceClient:
+    return TableServiceClient.from_connection_string(connection_string, transport=_pooled_transport())
+
+
+@lru_cache(maxsize=4)
+def _local_blob_storage(base_path: str) -> LocalBlobStorage:
+    logger.info(f"Using LocalBlobStorage at {base_path}")
+    return LocalBlobStorage(base_path)
+
+
+@lru_cache(maxsize=16)
+def _local_table_storage(table_file: str) -> LocalTableStorage:
+    logger.info(f"Using LocalTableStorage at {table_file}")
+    return LocalTableStorage(table_file)
+
 
 def get_blob_storage():
     use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
     
     if use_local:
         base_path = os.getenv('LOCAL_STORAGE_PATH', './local-dev/storage')
-        logger.info(f"Using LocalBlobStorage at {base_path}")
-        return LocalBlobStorage(base_path)
+        return _local_blob_storage(base_path)
     else:
         # Azure Functions uses AzureWebJobsStorage, but we also check AZURE_STORAGE_CONNECTION_STRING
         connection_string = os.getenv('AzureWebJobsStorage') or os.getenv('AZURE_STORAGE_CONNECTION_STRING')
         if not connection_string:
             raise ValueError("AzureWebJobsStorage or AZURE_STORAGE_CONNECTION_STRING not set")
-        logger.info("Using Azure Blob Storage")
-        return BlobServiceClient.from_connection_string(connection_string)
+        return _blob_service_client(connection_string)
+
+
+def get_async_container_client(container_name: str):
+    # Imported lazily so the aiohttp dependency is only needed by async callers
+    from azure.storage.blob.aio import ContainerClient
+    
+    connection_string = os.getenv('AzureWebJobsStorage') or os.getenv('AZURE_STORAGE_CONNECTION_STRING')
+    if not connection_string:
+        raise ValueError("AzureWebJobsStorage or AZURE_STORAGE_CONNECTION_STRING not set")
+    return ContainerClient.from_connection_string(connection_string, container_name)
 
 
 def get_table_storage(table_name: str):
@@ -28,14 +80,12 @@ def get_table_storage(table_name: str):
     
     if use_local:
         tables_path = os.getenv('LOCAL_TABLES_PATH', './local-dev/tables')
-        table_file = f"{tables_path}/{table_name}.json"
-        logger.info(f"Using LocalTableStorage at {table_file}")
-        return LocalTableStorage(table_file)
+        table_file = f"{tables_path}/{table_name}.sqlite"
+        return _local_table_storage(table_file)
     else:
         # Azure Functions uses AzureWebJobsStorage, but we prefer AZURE_STORAGE_TABLE_CONNECTION_STRING if set
         connection_string = os.getenv('AZURE_STORAGE_TABLE_CONNECTION_STRING') or os.getenv('AzureWebJobsStorage')
         if not connection_string:
             raise ValueError("AZURE_STORAGE_TABLE_CONNECTION_STRING or AzureWebJobsStorage not set")
         logger.info(f"Using Azure Table Storage: {table_name}")
-        table_service = TableServiceClient.from_connection_string(connection_string)
-        return table_service.get_table_client(table_name)
+        return _table_service_client(connection_string).get_table_client(table_name)
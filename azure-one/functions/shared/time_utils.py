@@ -0,0 +1,12 @@
+from datetime import datetime
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = None
+
+
+def parse_iso(value: str) -> datetime:
+    if parse_datetime is not None:
+        return parse_datetime(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
@@ -1,12 +1,18 @@
 import os
+import time
 import hmac
 import hashlib
 import logging
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
+from .time_utils import parse_iso
 
 logger = logging.getLogger(__name__)
 
+# Tokens are hex-encoded HMAC-SHA256 digests
+TOKEN_LENGTH = 64
+
 
 def get_auth_secret() -> str:
     secret = os.getenv('AUTH_SECRET')
@@ -15,26 +21,34 @@ def get_auth_secret() -> str:
     return secret
 
 
+@lru_cache(maxsize=4)
+def _hmac_template(secret: str) -> hmac.HMAC:
+    # Keyed once per secret; copy() skips redoing the key schedule on every token
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
 def generate_token(username: str, issued_date: str) -> str:
     secret = get_auth_secret()
     message = f"{username}:{issued_date}"
-    token = hmac.new(
-        secret.encode('utf-8'),
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    return token
+    mac = _hmac_template(secret).copy()
+    mac.update(message.encode('utf-8'))
+    return mac.hexdigest()
 
 
-def validate_token(token: str, username: str, issued_date: str) -> bool:
+def _validate_token(token: str, username: str, issued_date: str) -> bool:
     try:
-        issued_dt = datetime.fromisoformat(issued_date.replace('Z', '+00:00'))
+        issued_dt = parse_iso(issued_date)
         now = datetime.now(issued_dt.tzinfo)
         
         if now - issued_dt > timedelta(days=30):
             logger.warning(f"Token expired for user {username}")
             return False
         
+        # Malformed tokens can never match, so skip the HMAC for them
+        if len(token) != TOKEN_LENGTH:
+            logger.warning(f"Invalid token for user {username}")
+            return False
+        
         expected_token = generate_token(username, issued_date)
         is_valid = hmac.compare_digest(token, expected_token)
         
@@ -47,6 +61,26 @@ def validate_token(token: str, username: str, issued_date: str) -> bool:
         return False
 
 
+class _InvalidToken(Exception):
+    pass
+
+
+@lru_cache(maxsize=4096)
+def _validate_token_cached(token: str, username: str, issued_date: str, minute_bucket: int) -> bool:
+    # Failures raise so lru_cache only remembers successful validations
+    if not _validate_token(token, username, issued_date):
+        raise _InvalidToken()
+    return True
+
+
+def validate_token(token: str, username: str, issued_date: str) -> bool:
+    # The minute bucket in the key makes cached results expire within a minute
+    try:
+        return _validate_token_cached(token, username, issued_date, int(time.time()) // 60)
+    except _InvalidToken:
+        return False
+
+
 def extract_auth_headers(request) -> Optional[Tuple[str, str, str]]:
     token = request.headers.get('X-Token') or request.headers.get('Authorization', '').replace('Bearer ', '')
     issued_date = request.headers.get('X-Issued-Date')
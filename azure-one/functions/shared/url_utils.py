@@ -0,0 +1,9 @@
+import re
+
+# Greedy prefix so the last '/a/' segment wins, as with the previous split-based version
+_SHORTCODE_RE = re.compile(r'.*/a/([^?#]*)')
+
+
+def extract_shortcode(url: str) -> str:
+    match = _SHORTCODE_RE.match(url)
+    return match.group(1) if match else ''
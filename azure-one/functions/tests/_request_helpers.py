@@ -0,0 +1,60 @@
+from authenticate import authenticate
+from shared.json_utils import json_loads
+
+authenticate_main = authenticate._function.get_user_function()
+
+
+class MockHttpRequest:
+    def __init__(self, method='GET', params=None, body=None, headers=None):
+        self.method = method
+        self.params = params or {}
+        self._body = body
+        self.headers = headers or {}
+    
+    def get(self, key, default=None):
+        return self.params.get(key, default)
+    
+    def get_json(self):
+        if isinstance(self._body, dict):
+            return self._body
+        if isinstance(self._body, (str, bytes, bytearray)):
+            return json_loads(self._body)
+        return self._body
+    
+    def get_header(self, name):
+        return self.headers.get(name)
+
+
+def parse_response(response):
+    return response.status_code, json_loads(response.get_body())
+
+
+def authenticate_user(username: str, password: str) -> dict:
+    request = MockHttpRequest(
+        method='POST',
+        body={
+            "username": username,
+            "password": password
+        }
+    )
+    
+    response = authenticate_main(request)
+    
+    status_code, data = parse_response(response)
+    
+    if status_code == 200:
+        return {
+            "token": data["token"],
+            "username": data["username"],
+            "issued_date": data["issued_at"]
+        }
+    else:
+        raise ValueError(f"Authentication failed: {data.get('error', 'Unknown error')}")
+
+
+def create_auth_headers(auth_data: dict) -> dict:
+    return {
+        "X-Token": auth_data["token"],
+        "X-Username": auth_data["username"],
+        "X-Issued-Date": auth_data["issued_date"]
+    }
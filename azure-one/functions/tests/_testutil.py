@@ -0,0 +1,22 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from shared.json_utils import json_loads
+
+LOCAL_SETTINGS_PATH = Path(__file__).parent.parent / 'local.settings.json.local'
+
+
+@lru_cache(maxsize=1)
+def _read_local_settings(path: str, mtime_ns: int) -> dict:
+    with open(path, 'rb') as f:
+        return json_loads(f.read()).get('Values', {})
+
+
+def load_local_settings(path: Path = LOCAL_SETTINGS_PATH):
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return
+    
+    values = _read_local_settings(str(path), mtime_ns)
+    os.environ.update({key: str(value) for key, value in values.items() if key not in os.environ})
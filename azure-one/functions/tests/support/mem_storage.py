@@ -0,0 +1,49 @@
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Dict-backed stand-in for LocalBlobStorage: objects are stored as-is, with no JSON or disk IO
+class InMemoryBlobStorage:
+    def __init__(self):
+        self._store: Dict[str, Tuple[Any, float, int]] = {}
+        self._writes = 0
+    
+    def save_file(self, blob_path: str, content: Any):
+        self._writes += 1
+        self._store[blob_path] = (content, time.time(), self._writes)
+    
+    def read_file(self, blob_path: str) -> Optional[Any]:
+        entry = self._store.get(blob_path)
+        return entry[0] if entry else None
+    
+    def file_exists(self, blob_path: str) -> bool:
+        return blob_path in self._store
+    
+    def file_version(self, blob_path: str) -> Optional[int]:
+        entry = self._store.get(blob_path)
+        return entry[2] if entry else None
+    
+    def delete_file(self, blob_path: str):
+        self._store.pop(blob_path, None)
+    
+    def clear_all(self):
+        self._store.clear()
+    
+    def delete_prefix(self, prefix: str) -> int:
+        paths = [path for path in self._store if path.startswith(prefix)]
+        for path in paths:
+            del self._store[path]
+        return len(paths)
+    
+    def list_prefixes(self, prefix: str) -> List[str]:
+        children = {path[len(prefix):].partition('/') for path in self._store if path.startswith(prefix)}
+        return sorted(f"{prefix}{name}/" for name, sep, _ in children if sep)
+    
+    def list_files(self, prefix: str, max_results: Optional[int] = None) -> List[str]:
+        return list(islice((path for path in self._store if path.startswith(prefix)), max_results))
+    
+    def iter_prefix(self, prefix: str) -> Iterator[Tuple[str, float, int]]:
+        for path, (_, mtime, _) in list(self._store.items()):
+            if path.startswith(prefix):
+                yield path, mtime, 0
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
 import pytest
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
@@ -12,89 +12,118 @@ sys.path.insert(0, str(functions_dir))
 
 from functions.shared.cache_cleaner import CacheCleaner
 from functions.shared.local_storage import LocalBlobStorage
+from functions.tests.support.mem_storage import InMemoryBlobStorage
+
+# Offsets in these tests are at least half an hour, so one reference time serves the whole module
+_NOW = datetime.now(timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def _iso(offset_hours: float) -> str:
+    return (_NOW + timedelta(hours=offset_hours)).isoformat()
+
+
+def _epoch(offset_hours: float) -> float:
+    return (_NOW + timedelta(hours=offset_hours)).timestamp()
+
+
+@pytest.fixture(scope="module")
+def temp_storage():
+    return InMemoryBlobStorage()
+
+
+@pytest.fixture(autouse=True)
+def _clean(temp_storage):
+    yield
+    temp_storage.clear_all()
 
 
 @pytest.fixture
-def temp_storage(tmp_path):
+def disk_storage(tmp_path):
     storage_path = tmp_path / "storage"
     return LocalBlobStorage(str(storage_path))
 
 
-@pytest.fixture
-def cache_cleaner(temp_storage, monkeypatch):
-    monkeypatch.setenv('USE_LOCAL_STORAGE', 'true')
-    monkeypatch.setenv('STORAGE_CONTAINER', 'test-container')
-    
-    from functions.shared.storage_factory import get_blob_storage
-    original_get = get_blob_storage
-    
-    def mock_get_blob_storage():
-        return temp_storage
-    
-    monkeypatch.setattr('functions.shared.cache_cleaner.get_blob_storage', mock_get_blob_storage)
-    
-    return CacheCleaner()
+@pytest.fixture(scope="module")
+def cache_cleaner(temp_storage):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('USE_LOCAL_STORAGE', 'true')
+        mp.setenv('STORAGE_CONTAINER', 'test-container')
+        yield CacheCleaner(storage=temp_storage)
 
 
-def test_cache_cleaner_check_valid_cache(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    expires_at = now + timedelta(hours=1)
+def _cache_entry(field, offset_hours):
+    if field == 'fetch_timestamp':
+        return {
+            'feed_metadata': {'title': 'Test Feed', 'fetch_timestamp': _iso(offset_hours)},
+            'items': []
+        }
     
-    cache_data = {
+    entry = {
         'feed_metadata': {'title': 'Test Feed'},
         'items': [],
-        'expires_at': expires_at.isoformat(),
+        'expires_at': _iso(offset_hours),
         'cache_ttl_hours': 1
     }
-    
-    temp_storage.save_file('cache/yle/paauutiset.json', cache_data)
-    
-    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == True
+    if field == 'expires_at_epoch':
+        entry['expires_at_epoch'] = _epoch(offset_hours)
+    return entry
 
 
-def test_cache_cleaner_check_expired_cache(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    expires_at = now - timedelta(hours=1)
+@pytest.mark.parametrize("delta_hours,field,expected", [
+    (1, 'expires_at_epoch', True),
+    (-1, 'expires_at_epoch', False),
+    (1, 'expires_at', True),
+    (-1, 'expires_at', False),
+    (-0.5, 'fetch_timestamp', True),
+    (-2, 'fetch_timestamp', False),
+])
+def test_cache_cleaner_check_cache_valid(cache_cleaner, temp_storage, delta_hours, field, expected):
+    temp_storage.save_file('cache/yle/paauutiset.json', _cache_entry(field, delta_hours))
     
-    cache_data = {
-        'feed_metadata': {'title': 'Test Feed'},
-        'items': [],
-        'expires_at': expires_at.isoformat(),
-        'cache_ttl_hours': 1
-    }
+    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == expected
+
+
+@pytest.mark.parametrize("field,expired_delta,valid_delta", [
+    ('expires_at', -1, 1),
+    ('fetch_timestamp', -2, -0.5),
+])
+def test_cache_cleaner_cleanup_expired(cache_cleaner, temp_storage, field, expired_delta, valid_delta):
+    temp_storage.save_file('cache/yle/expired.json', _cache_entry(field, expired_delta))
+    temp_storage.save_file('cache/yle/valid.json', _cache_entry(field, valid_delta))
     
-    temp_storage.save_file('cache/yle/paauutiset.json', cache_data)
+    cleaned = cache_cleaner.cleanup_expired('cache/yle/', ttl_hours=1)
     
-    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == False
+    assert cleaned == 1
+    assert not temp_storage.file_exists('cache/yle/expired.json')
+    assert temp_storage.file_exists('cache/yle/valid.json')
 
 
-def test_cache_cleaner_check_cache_with_timestamp(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    fetch_time = now - timedelta(minutes=30)
-    
-    cache_data = {
-        'feed_metadata': {
-            'title': 'Test Feed',
-            'fetch_timestamp': fetch_time.isoformat()
-        },
-        'items': []
+def test_check_cache_valid_many(cache_cleaner, temp_storage):
+    temp_storage.save_file('cache/yle/articles/valid_fi.json', {
+        'expires_at': _iso(1)
+    })
+    temp_storage.save_file('cache/yle/articles/expired_fi.json', {
+        'expires_at': _iso(-1)
+    })
+    
+    results = cache_cleaner.check_cache_valid_many([
+        'cache/yle/articles/valid_fi.json',
+        'cache/yle/articles/expired_fi.json',
+        'cache/yle/articles/missing_fi.json'
+    ], ttl_hours=1)
+    
+    assert results == {
+        'cache/yle/articles/valid_fi.json': True,
+        'cache/yle/articles/expired_fi.json': False,
+        'cache/yle/articles/missing_fi.json': False
     }
-    
-    temp_storage.save_file('cache/yle/paauutiset.json', cache_data)
-    
-    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == True
 
 
-def test_cache_cleaner_check_expired_cache_with_timestamp(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    fetch_time = now - timedelta(hours=2)
-    
+def test_expires_at_epoch_takes_precedence(cache_cleaner, temp_storage):
     cache_data = {
-        'feed_metadata': {
-            'title': 'Test Feed',
-            'fetch_timestamp': fetch_time.isoformat()
-        },
-        'items': []
+        'expires_at': _iso(1),
+        'expires_at_epoch': _epoch(-1)
     }
     
     temp_storage.save_file('cache/yle/paauutiset.json', cache_data)
@@ -102,98 +131,40 @@ def test_cache_cleaner_check_expired_cache_with_timestamp(cache_cleaner, temp_st
     assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == False
 
 
-def test_cache_cleaner_cleanup_expired(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    
-    expired_data = {
-        'feed_metadata': {'title': 'Expired Feed'},
-        'items': [],
-        'expires_at': (now - timedelta(hours=1)).isoformat(),
-        'cache_ttl_hours': 1
-    }
-    
-    valid_data = {
-        'feed_metadata': {'title': 'Valid Feed'},
-        'items': [],
-        'expires_at': (now + timedelta(hours=1)).isoformat(),
-        'cache_ttl_hours': 1
-    }
-    
-    temp_storage.save_file('cache/yle/expired.json', expired_data)
-    temp_storage.save_file('cache/yle/valid.json', valid_data)
-    
-    cleaned = cache_cleaner.cleanup_expired('cache/yle/', ttl_hours=1)
-    
-    assert cleaned == 1
-    assert not temp_storage.file_exists('cache/yle/expired.json')
-    assert temp_storage.file_exists('cache/yle/valid.json')
-
-
-def test_cache_cleaner_cleanup_expired_with_timestamp(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    
-    expired_data = {
-        'feed_metadata': {
-            'title': 'Expired Feed',
-            'fetch_timestamp': (now - timedelta(hours=2)).isoformat()
-        },
-        'items': []
-    }
-    
-    valid_data = {
-        'feed_metadata': {
-            'title': 'Valid Feed',
-            'fetch_timestamp': (now - timedelta(minutes=30)).isoformat()
-        },
-        'items': []
-    }
-    
-    temp_storage.save_file('cache/yle/expired.json', expired_data)
-    temp_storage.save_file('cache/yle/valid.json', valid_data)
-    
-    cleaned = cache_cleaner.cleanup_expired('cache/yle/', ttl_hours=1)
+def test_check_cache_valid_sees_rewritten_file(cache_cleaner, temp_storage):
+    temp_storage.save_file('cache/yle/paauutiset.json', {'expires_at': _iso(1)})
+    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == True
     
-    assert cleaned == 1
-    assert not temp_storage.file_exists('cache/yle/expired.json')
-    assert temp_storage.file_exists('cache/yle/valid.json')
+    temp_storage.save_file('cache/yle/paauutiset.json', {'expires_at': _iso(-1)})
+    assert cache_cleaner.check_cache_valid('cache/yle/paauutiset.json', ttl_hours=1) == False
 
 
-def test_article_cache_with_expires_at(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    expires_at = now + timedelta(hours=1)
-    
-    article_data = {
-        'url': 'https://yle.fi/a/74-20197424',
-        'shortcode': '74-20197424',
-        'title': 'Test Article',
-        'paragraphs': ['Paragraph 1', 'Paragraph 2'],
-        'scraped_at': now.isoformat(),
-        'expires_at': expires_at.isoformat(),
-        'cache_ttl_hours': 1
-    }
+def test_cleanup_expired_with_local_blob_storage(disk_storage, monkeypatch):
+    monkeypatch.setenv('USE_LOCAL_STORAGE', 'true')
+    cleaner = CacheCleaner(storage=disk_storage)
     
-    temp_storage.save_file('cache/yle/articles/74-20197424_fi.json', article_data)
+    disk_storage.save_file('cache/yle/expired.json', {'expires_at': _iso(-1)})
+    disk_storage.save_file('cache/yle/valid.json', {'expires_at': _iso(1)})
     
-    assert cache_cleaner.check_cache_valid('cache/yle/articles/74-20197424_fi.json', ttl_hours=1) == True
+    assert cleaner.check_cache_valid('cache/yle/valid.json', ttl_hours=1) == True
+    assert cleaner.cleanup_expired('cache/yle/', ttl_hours=1) == 1
+    assert not disk_storage.file_exists('cache/yle/expired.json')
+    assert disk_storage.file_exists('cache/yle/valid.json')
 
 
-def test_article_cache_expired(cache_cleaner, temp_storage):
-    now = datetime.now(timezone.utc)
-    expires_at = now - timedelta(hours=1)
-    
-    article_data = {
-        'url': 'https://yle.fi/a/74-20197424',
-        'shortcode': '74-20197424',
-        'title': 'Test Article',
-        'paragraphs': ['Paragraph 1'],
-        'scraped_at': (now - timedelta(hours=2)).isoformat(),
-        'expires_at': expires_at.isoformat(),
-        'cache_ttl_hours': 1
-    }
+def test_cleanup_expired_skips_non_json_files(disk_storage, monkeypatch):
+    monkeypatch.setenv('USE_LOCAL_STORAGE', 'true')
+    cleaner = CacheCleaner(storage=disk_storage)
     
-    temp_storage.save_file('cache/yle/articles/74-20197424_fi.json', article_data)
+    disk_storage.save_file('cache/yle/expired.json', {'expires_at': _iso(-1)})
+    disk_storage.save_file('cache/yle/notes.txt', 'keep me')
+    stale = _epoch(-48)
+    for name in ('expired.json', 'notes.txt'):
+        os.utime(disk_storage.full_path(f'cache/yle/{name}'), (stale, stale))
     
-    assert cache_cleaner.check_cache_valid('cache/yle/articles/74-20197424_fi.json', ttl_hours=1) == False
+    assert cleaner.cleanup_expired('cache/yle/', ttl_hours=1) == 1
+    assert not disk_storage.file_exists('cache/yle/expired.json')
+    assert disk_storage.file_exists('cache/yle/notes.txt')
 
 
 if __name__ == "__main__":
@@ -1,107 +1,66 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
 import logging
-from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 functions_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(functions_dir.parent))
 sys.path.insert(0, str(functions_dir))
 
-from shared.token_validator import generate_token
-import azure.functions as func
 
+def _bootstrap_env():
+    os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
+    os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
+    os.environ.setdefault('LOCAL_TABLES_PATH', './local-dev/tables')
+    os.environ.setdefault('STORAGE_CONTAINER', 'finnish-news-tools')
+    os.environ.setdefault('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
+    os.environ.setdefault('ADD_ORIGIN_RSS', 'true')
+    os.environ.setdefault('RSS_PARSER_DAILY_LIMIT', '50')
+    os.environ.setdefault('ARTICLE_SCRAPER_DAILY_LIMIT', '50')
+    os.environ.setdefault('RATE_LIMIT_TABLE_NAME', 'rateLimits')
+    os.environ.setdefault('CACHE_TTL_HOURS', '1')
+    os.environ.setdefault('AUTH_SECRET', 'test-secret-key-change-in-production')
+    config_path = Path(__file__).parent.parent / 'scraper-config.yaml.local'
+    template_path = Path(__file__).parent.parent / 'scraper-config.yaml.template'
+    os.environ.setdefault('SCRAPER_CONFIG_PATH', str(config_path if config_path.is_file() else template_path))
 
-class MockHeaders:
-    def __init__(self, headers_dict):
-        self._headers = headers_dict
-    
-    def get(self, key, default=None):
-        return self._headers.get(key, default)
 
+# Handler modules read their settings at import time, so the env has to be in place first.
+if __name__ == "__main__" or "PYTEST_CURRENT_TEST" in os.environ:
+    _bootstrap_env()
 
-class MockParams:
-    def __init__(self, params_dict):
-        self._params = params_dict
-    
-    def get(self, key, default=None):
-        return self._params.get(key, default)
+from shared.json_utils import json_dumps
+from tests._request_helpers import MockHttpRequest, authenticate_user, create_auth_headers, parse_response
+from rss_feed_parser import rss_feed_parser
+from article_scraper import article_scraper
+from rss_feed_parser.storage_client import StorageClient as RSSStorageClient
+from article_scraper.storage_client import StorageClient as ArticleStorageClient
 
+rss_feed_parser_main = rss_feed_parser._function.get_user_function()
+article_scraper_main = article_scraper._function.get_user_function()
 
-class MockHttpRequest:
-    def __init__(self, method='GET', params=None, body=None, headers=None):
-        self.method = method
-        self.params = MockParams(params or {})
-        self._body = body
-        self.headers = MockHeaders(headers or {})
-    
-    def get(self, key, default=None):
-        return self.params.get(key, default)
-    
-    def get_json(self):
-        if isinstance(self._body, dict):
-            return self._body
-        if isinstance(self._body, str):
-            return json.loads(self._body)
-        return self._body
-    
-    def get_header(self, name):
-        return self.headers.get(name)
 
+@lru_cache(maxsize=1)
+def _rss_client():
+    return RSSStorageClient()
 
-def authenticate_user(username: str, password: str) -> dict:
-    from authenticate import main as authenticate_main
-    
-    request = MockHttpRequest(
-        method='POST',
-        body={
-            "username": username,
-            "password": password
-        }
-    )
-    
-    response = authenticate_main(request)
-    
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
-    
-    if response.status_code == 200:
-        auth_data = json.loads(body_str)
-        return {
-            "token": auth_data["token"],
-            "username": auth_data["username"],
-            "issued_date": auth_data["issued_at"]
-        }
-    else:
-        error_data = json.loads(body_str)
-        raise ValueError(f"Authentication failed: {error_data.get('error', 'Unknown error')}")
 
-
-def create_auth_headers(auth_data: dict) -> dict:
-    return {
-        "X-Token": auth_data["token"],
-        "X-Username": auth_data["username"],
-        "X-Issued-Date": auth_data["issued_date"]
-    }
+@lru_cache(maxsize=1)
+def _article_client():
+    return ArticleStorageClient()
 
 
 def check_cache_status():
-    from rss_feed_parser.storage_client import StorageClient as RSSStorageClient
-    from article_scraper.storage_client import StorageClient as ArticleStorageClient
-    
     logger = logging.getLogger(__name__)
     
     logger.info("=" * 60)
     logger.info("Checking Cache/Storage Status")
     logger.info("=" * 60)
     
-    rss_storage = RSSStorageClient()
-    article_storage = ArticleStorageClient()
+    rss_storage = _rss_client()
+    article_storage = _article_client()
     
     rss_status = rss_storage.get_cache_status()
     article_status = article_storage.get_cache_status()
@@ -127,9 +86,18 @@ def check_cache_status():
     return rss_status, article_status
 
 
+def _build_status_from_result(rss_result: dict, rss_status: dict) -> dict:
+    feed_metadata = rss_result.get('feed_metadata', {})
+    return {
+        **rss_status,
+        "rss_feed_exists": True,
+        "rss_feed_items_count": len(rss_result.get('items', [])),
+        "rss_feed_title": feed_metadata.get('title', ''),
+        "rss_feed_last_fetch": feed_metadata.get('fetch_timestamp', '')
+    }
+
+
 def fetch_rss_feed_if_needed(auth_headers: dict, rss_status: dict):
-    from rss_feed_parser import main
-    
     logger = logging.getLogger(__name__)
     
     if rss_status['rss_feed_exists']:
@@ -145,39 +113,32 @@ def fetch_rss_feed_if_needed(auth_headers: dict, rss_status: dict):
         headers=auth_headers
     )
     
-    response = main(request)
+    response = rss_feed_parser_main(request)
     
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
+    status_code, data = parse_response(response)
     
-    if response.status_code == 200:
-        result = json.loads(body_str)
+    if status_code == 200:
+        result = data
         logger.info(f"✓ RSS feed fetched successfully ({result.get('items_count', 0)} items)")
         return result
     else:
-        logger.error(f"✗ Error fetching RSS feed: {body_str}")
+        logger.error(f"✗ Error fetching RSS feed: {data}")
         return None
 
 
 def fetch_article_if_needed(auth_headers: dict, rss_status: dict, article_status: dict):
-    from rss_feed_parser.storage_client import StorageClient as RSSStorageClient
-    from article_scraper import main
-    
     logger = logging.getLogger(__name__)
     
     if not rss_status['rss_feed_exists']:
         logger.warning("Cannot fetch article: RSS feed not available")
-        return None
+        return None, None
     
-    rss_storage = RSSStorageClient()
+    rss_storage = _rss_client()
     feed_data = rss_storage.get_rss_feed(rss_status['rss_feed_path'])
     
     if not feed_data or not feed_data.get('items'):
         logger.warning("Cannot fetch article: RSS feed has no items")
-        return None
+        return None, None
     
     first_item = feed_data['items'][0]
     article_url = first_item.get('link', '')
@@ -185,11 +146,10 @@ def fetch_article_if_needed(auth_headers: dict, rss_status: dict, article_status
     
     if not article_url:
         logger.warning("Cannot fetch article: No URL in RSS feed item")
-        return None
+        return None, None
     
     article_blob_path = f"cache/yle/articles/{shortcode}_fi.json"
-    from article_scraper.storage_client import StorageClient as ArticleStorageClient
-    article_storage = ArticleStorageClient()
+    article_storage = _article_client()
     
     if article_storage.check_article_exists(article_blob_path):
         logger.info(f"Article already cached: {shortcode}")
@@ -198,7 +158,7 @@ def fetch_article_if_needed(auth_headers: dict, rss_status: dict, article_status
         if article_data:
             logger.info(f"  Title: {article_data.get('title', 'N/A')}")
             logger.info(f"  Paragraphs: {len(article_data.get('paragraphs', []))}")
-        return article_data
+        return {"shortcode": shortcode, "blob_path": article_blob_path, "cached": True}, article_data
     
     logger.info(f"Article not found in cache, scraping: {article_url}")
     
@@ -211,28 +171,25 @@ def fetch_article_if_needed(auth_headers: dict, rss_status: dict, article_status
         }
     )
     
-    response = main(request)
+    response = article_scraper_main(request)
     
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
+    status_code, data = parse_response(response)
     
-    if response.status_code == 200:
-        result = json.loads(body_str)
+    if status_code == 200:
+        result = data
         if result.get('success') and result.get('results'):
             article_result = result['results'][0]
             if article_result.get('success'):
                 logger.info(f"✓ Article scraped successfully: {article_result.get('shortcode')}")
                 logger.info(f"  Path: {article_result.get('blob_path')}")
                 logger.info(f"  Paragraphs: {article_result.get('paragraphs_count', 0)}")
-                return article_result
+                # The scraper response already carries the article content, so there is nothing to re-read
+                return article_result, article_result
         logger.error(f"✗ Error scraping article: {result}")
-        return None
+        return None, None
     else:
-        logger.error(f"✗ Error scraping article: {body_str}")
-        return None
+        logger.error(f"✗ Error scraping article: {data}")
+        return None, None
 
 
 def main():
@@ -278,7 +235,7 @@ def main():
     if rss_result:
         logger.info("")
         logger.info("RSS Feed Result:")
-        print(json.dumps(rss_result, indent=2, ensure_ascii=False))
+        print(json_dumps(rss_result, indent=True).decode('utf-8'))
         logger.info("")
     
     logger.info("=" * 60)
@@ -286,20 +243,14 @@ def main():
     logger.info("=" * 60)
     logger.info("")
     
-    rss_status, article_status = check_cache_status()
-    article_result = fetch_article_if_needed(auth_headers, rss_status, article_status)
+    if rss_result:
+        rss_status = _build_status_from_result(rss_result, rss_status)
+    article_meta, article_data = fetch_article_if_needed(auth_headers, rss_status, article_status)
     
-    if article_result:
+    if article_data:
         logger.info("")
         logger.info("Article Result:")
-        if isinstance(article_result, dict) and 'blob_path' in article_result:
-            from article_scraper.storage_client import StorageClient as ArticleStorageClient
-            article_storage = ArticleStorageClient()
-            article_data = article_storage.get_article(article_result['blob_path'])
-            if article_data:
-                print(json.dumps(article_data, indent=2, ensure_ascii=False))
-        else:
-            print(json.dumps(article_result, indent=2, ensure_ascii=False))
+        print(json_dumps(article_data, indent=True).decode('utf-8'))
         logger.info("")
     
     logger.info("=" * 60)
@@ -316,22 +267,4 @@ def main():
 
 
 if __name__ == "__main__":
-    os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
-    os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
-    os.environ.setdefault('LOCAL_TABLES_PATH', './local-dev/tables')
-    os.environ.setdefault('STORAGE_CONTAINER', 'finnish-news-tools')
-    os.environ.setdefault('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
-    os.environ.setdefault('ADD_ORIGIN_RSS', 'true')
-    os.environ.setdefault('RSS_PARSER_DAILY_LIMIT', '50')
-    os.environ.setdefault('ARTICLE_SCRAPER_DAILY_LIMIT', '50')
-    os.environ.setdefault('RATE_LIMIT_TABLE_NAME', 'rateLimits')
-    os.environ.setdefault('CACHE_TTL_HOURS', '1')
-    os.environ.setdefault('AUTH_SECRET', 'test-secret-key-change-in-production')
-    config_path = str(Path(__file__).parent.parent / 'scraper-config.yaml.local')
-    if os.path.exists(config_path):
-        os.environ.setdefault('SCRAPER_CONFIG_PATH', config_path)
-    else:
-        os.environ.setdefault('SCRAPER_CONFIG_PATH', str(Path(__file__).parent.parent / 'scraper-config.yaml.template'))
-    
     main()
-
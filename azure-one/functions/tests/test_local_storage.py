@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import sys
+import pytest
+from pathlib import Path
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import UpdateMode
+
+functions_dir = Path(__file__).parent.parent / 'functions'
+sys.path.insert(0, str(functions_dir.parent))
+sys.path.insert(0, str(functions_dir))
+
+from functions.shared.local_storage import LocalTableStorage
+
+
+@pytest.fixture
+def table(tmp_path):
+    return LocalTableStorage(str(tmp_path / "tables" / "entities.db"))
+
+
+def _entity(**fields):
+    return {'PartitionKey': 'rate_limits', 'RowKey': 'scrape', **fields}
+
+
+def test_get_missing_entity_returns_none(table):
+    assert table.get_entity('rate_limits', 'scrape') is None
+
+
+def test_create_duplicate_raises(table):
+    table.create_entity(_entity(request_count=1))
+    
+    with pytest.raises(ResourceExistsError):
+        table.create_entity(_entity(request_count=2))
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 1
+
+
+def test_update_bumps_etag(table):
+    table.create_entity(_entity(request_count=1))
+    before = table.get_entity('rate_limits', 'scrape').metadata['etag']
+    
+    table.update_entity(_entity(request_count=2))
+    assert table.get_entity('rate_limits', 'scrape').metadata['etag'] != before
+
+
+def test_update_with_stale_etag_raises(table):
+    table.create_entity(_entity(request_count=1))
+    stale = table.get_entity('rate_limits', 'scrape')
+    table.update_entity(_entity(request_count=2))
+    
+    stale['request_count'] = 5
+    with pytest.raises(ResourceModifiedError):
+        table.update_entity(stale, mode=UpdateMode.MERGE, etag=stale.metadata['etag'],
+                            match_condition=MatchConditions.IfNotModified)
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 2
+
+
+def test_update_with_current_etag_succeeds(table):
+    table.create_entity(_entity(request_count=1))
+    current = table.get_entity('rate_limits', 'scrape')
+    
+    current['request_count'] = 2
+    table.update_entity(current, mode=UpdateMode.MERGE, etag=current.metadata['etag'],
+                        match_condition=MatchConditions.IfNotModified)
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 2
+
+
+def test_stale_etag_ignored_without_match_condition(table):
+    table.create_entity(_entity(request_count=1))
+    
+    table.update_entity(_entity(request_count=3), etag='999')
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 3
+
+
+def test_update_missing_entity_raises(table):
+    with pytest.raises(ResourceNotFoundError):
+        table.update_entity(_entity(request_count=1))
+
+
+def test_merge_keeps_untouched_fields(table):
+    table.create_entity(_entity(request_count=1, function_name='scrape', date='2024-01-01'))
+    
+    table.update_entity(_entity(request_count=2), mode=UpdateMode.MERGE)
+    entity = table.get_entity('rate_limits', 'scrape')
+    assert entity['request_count'] == 2
+    assert entity['function_name'] == 'scrape'
+    assert entity['date'] == '2024-01-01'
+
+
+def test_replace_drops_untouched_fields(table):
+    table.create_entity(_entity(request_count=1, function_name='scrape'))
+    
+    table.update_entity(_entity(request_count=2), mode=UpdateMode.REPLACE)
+    entity = table.get_entity('rate_limits', 'scrape')
+    assert entity['request_count'] == 2
+    assert 'function_name' not in entity
+
+
+def test_upsert_creates_then_updates(table):
+    table.upsert_entity(_entity(request_count=1))
+    first = table.get_entity('rate_limits', 'scrape')
+    table.upsert_entity(_entity(request_count=4))
+    
+    entity = table.get_entity('rate_limits', 'scrape')
+    assert entity['request_count'] == 4
+    assert entity.metadata['etag'] != first.metadata['etag']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+import sys
+import threading
+import pytest
+from pathlib import Path
+
+functions_dir = Path(__file__).parent.parent / 'functions'
+sys.path.insert(0, str(functions_dir.parent))
+sys.path.insert(0, str(functions_dir))
+
+from functions.shared import rate_limiter
+from functions.shared.rate_limiter import (
+    CachedRateLimiter, DailyRateLimiter, MAX_UPDATE_ATTEMPTS, _conditional_increment
+)
+from functions.shared.local_storage import LocalTableStorage
+
+
+class _Interleaved:
+    # Delegates to a real table; before each of the first `conflicts` updates another writer bumps the row,
+    # so the caller's etag is stale and LocalTableStorage rejects the write
+    def __init__(self, table, conflicts: int):
+        self.table = table
+        self.conflicts = conflicts
+        self.update_calls = 0
+    
+    def get_entity(self, partition_key, row_key):
+        return self.table.get_entity(partition_key, row_key)
+    
+    def create_entity(self, entity):
+        return self.table.create_entity(entity)
+    
+    def update_entity(self, entity, **kwargs):
+        self.update_calls += 1
+        if self.update_calls <= self.conflicts:
+            current = self.table.get_entity(entity['PartitionKey'], entity['RowKey'])
+            current['request_count'] += 1
+            self.table.upsert_entity(current)
+        return self.table.update_entity(entity, **kwargs)
+
+
+@pytest.fixture
+def table(tmp_path):
+    return LocalTableStorage(str(tmp_path / "ratelimits.db"))
+
+
+@pytest.fixture
+def limiter(table, monkeypatch):
+    monkeypatch.setattr(rate_limiter, '_get_table_client', lambda table_name: table)
+    return DailyRateLimiter('ratelimits')
+
+
+def _row_key(limiter, function_name='scrape'):
+    return limiter._get_row_key(function_name)
+
+
+def test_first_call_creates_row(limiter, table):
+    assert limiter.check_and_increment('scrape', 3) == True
+    
+    entity = table.get_entity('rate_limits', _row_key(limiter))
+    assert entity['request_count'] == 1
+    assert entity['function_name'] == 'scrape'
+    assert entity['date'] == limiter._get_date_key()
+
+
+def test_rejects_at_limit_without_incrementing(limiter, table):
+    assert limiter.check_and_increment('scrape', 2) == True
+    assert limiter.check_and_increment('scrape', 2) == True
+    assert limiter.check_and_increment('scrape', 2) == False
+    assert limiter.check_and_increment('scrape', 2) == False
+    
+    assert table.get_entity('rate_limits', _row_key(limiter))['request_count'] == 2
+
+
+def test_zero_limit_never_creates_row(limiter, table):
+    assert limiter.check_and_increment('scrape', 0) == False
+    assert table.get_entity('rate_limits', _row_key(limiter)) is None
+
+
+def test_retries_after_etag_conflict(table):
+    table.create_entity({'PartitionKey': 'rate_limits', 'RowKey': 'scrape', 'request_count': 1})
+    interleaved = _Interleaved(table, conflicts=1)
+    
+    # Our first write loses to the other writer (1 -> 2); the retry re-reads and lands 2 -> 3
+    assert _conditional_increment(interleaved, 'rate_limits', 'scrape', {}, limit=10) == 3
+    assert interleaved.update_calls == 2
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 3
+
+
+def test_retry_respects_limit_reached_by_other_writer(table):
+    table.create_entity({'PartitionKey': 'rate_limits', 'RowKey': 'scrape', 'request_count': 1})
+    interleaved = _Interleaved(table, conflicts=1)
+    
+    assert _conditional_increment(interleaved, 'rate_limits', 'scrape', {}, limit=2) is None
+    assert table.get_entity('rate_limits', 'scrape')['request_count'] == 2
+
+
+def test_raises_after_max_attempts(table):
+    table.create_entity({'PartitionKey': 'rate_limits', 'RowKey': 'scrape', 'request_count': 0})
+    interleaved = _Interleaved(table, conflicts=MAX_UPDATE_ATTEMPTS)
+    
+    with pytest.raises(RuntimeError):
+        _conditional_increment(interleaved, 'rate_limits', 'scrape', {}, limit=100)
+    assert interleaved.update_calls == MAX_UPDATE_ATTEMPTS
+
+
+def test_concurrent_callers_never_exceed_limit(limiter, table):
+    daily_limit = 20
+    allowed = []
+    allowed_lock = threading.Lock()
+    start = threading.Barrier(8)
+    
+    def worker():
+        start.wait()
+        for _ in range(10):
+            try:
+                ok = limiter.check_and_increment('scrape', daily_limit)
+            except RuntimeError:
+                # Lost every retry to other writers; the caller treats this as a failure, not an increment
+                ok = False
+            if ok:
+                with allowed_lock:
+                    allowed.append(1)
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    count = table.get_entity('rate_limits', _row_key(limiter))['request_count']
+    assert count == len(allowed)
+    assert count <= daily_limit
+    assert limiter.check_and_increment('scrape', daily_limit) == (count < daily_limit)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def table_reads(limiter, monkeypatch):
+    reads = []
+    get_daily_count = limiter.get_daily_count
+    
+    def counting(function_name):
+        reads.append(function_name)
+        return get_daily_count(function_name)
+    
+    monkeypatch.setattr(limiter, 'get_daily_count', counting)
+    return reads
+
+
+def _seed(limiter, table, count):
+    table.upsert_entity({
+        'PartitionKey': 'rate_limits',
+        'RowKey': _row_key(limiter),
+        'request_count': count
+    })
+
+
+def test_cached_limiter_answers_locally_when_fresh_and_under_limit(limiter, table, table_reads, clock):
+    cached = CachedRateLimiter(limiter, sync_seconds=30, safety_margin=5)
+    _seed(limiter, table, 2)
+    
+    for _ in range(5):
+        assert cached.check_limit('scrape', 100) == True
+        clock.now += 1
+    assert len(table_reads) == 1
+
+
+def test_cached_limiter_rereads_once_stale(limiter, table, table_reads, clock):
+    cached = CachedRateLimiter(limiter, sync_seconds=30, safety_margin=5)
+    _seed(limiter, table, 2)
+    
+    assert cached.check_limit('scrape', 100) == True
+    clock.now += 29
+    assert cached.check_limit('scrape', 100) == True
+    assert len(table_reads) == 1
+    
+    # Another instance used up the quota meanwhile; the stale local count must not hide that
+    _seed(limiter, table, 100)
+    clock.now += 2
+    assert cached.check_limit('scrape', 100) == False
+    assert len(table_reads) == 2
+
+
+@pytest.mark.parametrize("count,reads", [(4, 1), (5, 3), (9, 3)])
+def test_cached_limiter_rereads_near_limit(limiter, table, table_reads, clock, count, reads):
+    cached = CachedRateLimiter(limiter, sync_seconds=30, safety_margin=5)
+    _seed(limiter, table, count)
+    
+    # Limit 10 with margin 5: counts of 5 and above go back to the table on every check
+    for _ in range(3):
+        assert cached.check_limit('scrape', 10) == True
+    assert len(table_reads) == reads
+
+
+def test_cached_limiter_increment_moves_count_into_margin(limiter, table, table_reads, clock):
+    cached = CachedRateLimiter(limiter, sync_seconds=30, safety_margin=5)
+    _seed(limiter, table, 3)
+    
+    assert cached.check_limit('scrape', 10) == True
+    cached.increment('scrape')
+    assert cached.check_limit('scrape', 10) == True
+    assert len(table_reads) == 1
+    
+    cached.increment('scrape')
+    assert cached.check_limit('scrape', 10) == True
+    assert len(table_reads) == 2
+    assert table.get_entity('rate_limits', _row_key(limiter))['request_count'] == 5
+
+
+def test_cached_limiter_without_sync_window_always_reads(limiter, table, table_reads):
+    cached = CachedRateLimiter(limiter, sync_seconds=0, safety_margin=0)
+    _seed(limiter, table, 1)
+    
+    assert cached.check_limit('scrape', 2) == True
+    _seed(limiter, table, 2)
+    assert cached.check_limit('scrape', 2) == False
+    assert len(table_reads) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
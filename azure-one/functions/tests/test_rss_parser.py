@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+import sys
+import pytest
+import requests
+from types import SimpleNamespace
+from unittest.mock import patch
+from pathlib import Path
+
+functions_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(functions_dir))
+sys.path.insert(0, str(functions_dir.parent))
+
+from rss_feed_parser import rss_parser
+from rss_feed_parser.rss_parser import add_origin_rss, parse_rss_feed
+
+FEED_URL = 'https://yle.fi/rss/uutiset/paauutiset'
+
+FEED_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Yle Uutiset | P&#228;&#228;uutiset</title>
+    <link>https://yle.fi/uutiset</link>
+    <description>Yle Uutiset &amp; ajankohtaiset</description>
+    <language>fi</language>
+    <lastBuildDate>Mon, 01 Jan 2024 10:00:00 +0200</lastBuildDate>
+    <item>
+      <title>Hallitus &amp; oppositio</title>
+      <link>https://yle.fi/a/74-20012345</link>
+      <description><![CDATA[<p>Kuvaus <b>lihavoituna</b> &amp; lis&auml;&auml;</p>]]></description>
+      <guid isPermaLink="false">https://yle.fi/a/74-20012345</guid>
+      <pubDate>Mon, 01 Jan 2024 09:00:00 +0200</pubDate>
+      <category>Politiikka</category>
+      <category>Kotimaa</category>
+      <category> Talous </category>
+    </item>
+    <item>
+      <title>Ilman guidia</title>
+      <link>https://yle.fi/a/74-20067890?utm_source=rss#top</link>
+      <description>Tavallinen kuvaus</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def _response(content: bytes, status_code: int = 200):
+    def raise_for_status():
+        if status_code >= 400:
+            raise requests.HTTPError(f"{status_code} Error", response=SimpleNamespace(status_code=status_code))
+    
+    return SimpleNamespace(content=content, status_code=status_code, raise_for_status=raise_for_status)
+
+
+@pytest.fixture
+def feed_get():
+    with patch.object(rss_parser._SESSION, 'get', return_value=_response(FEED_XML)) as get:
+        yield get
+
+
+def test_parses_channel_metadata(feed_get):
+    result = parse_rss_feed(FEED_URL)
+    
+    feed_get.assert_called_once_with(FEED_URL, timeout=rss_parser.FEED_TIMEOUT_SECONDS)
+    assert result['feed_metadata']['title'] == 'Yle Uutiset | Pääuutiset'
+    assert result['feed_metadata']['description'] == 'Yle Uutiset & ajankohtaiset'
+    assert result['feed_metadata']['language'] == 'fi'
+    assert result['feed_metadata']['last_build_date'] == 'Mon, 01 Jan 2024 10:00:00 +0200'
+    assert result['cache_ttl_hours'] == 1
+
+
+def test_parses_items(feed_get):
+    first, second = parse_rss_feed(FEED_URL)['items']
+    
+    assert first['title'] == 'Hallitus & oppositio'
+    # CDATA keeps the markup and the entities inside it verbatim
+    assert first['description'] == '<p>Kuvaus <b>lihavoituna</b> &amp; lis&auml;&auml;</p>'
+    assert first['categories'] == ['Politiikka', 'Kotimaa', 'Talous']
+    assert first['pub_date'] == 'Mon, 01 Jan 2024 09:00:00 +0200'
+    assert first['shortcode'] == '74-20012345'
+    
+    assert second['categories'] == []
+    assert second['pub_date'] == ''
+    assert second['guid'] == second['link']
+
+
+def test_add_origin_rss_on_links(feed_get):
+    first, second = parse_rss_feed(FEED_URL)['items']
+    
+    assert first['link'] == 'https://yle.fi/a/74-20012345?origin=rss'
+    assert first['guid'] == 'https://yle.fi/a/74-20012345'
+    assert second['link'] == 'https://yle.fi/a/74-20067890?utm_source=rss&origin=rss#top'
+    assert second['shortcode'] == '74-20067890'
+
+
+def test_links_untouched_without_origin_suffix(feed_get):
+    first, second = parse_rss_feed(FEED_URL, add_origin_rss_suffix=False)['items']
+    
+    assert first['link'] == 'https://yle.fi/a/74-20012345'
+    assert second['link'] == 'https://yle.fi/a/74-20067890?utm_source=rss#top'
+    assert second['guid'] == second['link']
+
+
+@pytest.mark.parametrize("url,expected", [
+    ('https://yle.fi/a/1', 'https://yle.fi/a/1?origin=rss'),
+    ('https://yle.fi/a/1?x=1', 'https://yle.fi/a/1?x=1&origin=rss'),
+    ('https://yle.fi/a/1?origin=feed', 'https://yle.fi/a/1?origin=feed'),
+    ('https://yle.fi/a/1#kommentit', 'https://yle.fi/a/1?origin=rss#kommentit'),
+])
+def test_add_origin_rss(url, expected):
+    assert add_origin_rss(url) == expected
+
+
+def test_http_error_raises():
+    # feedparser used to hand back an empty feed here; an error now raises so no empty feed gets cached
+    with patch.object(rss_parser._SESSION, 'get', return_value=_response(b'', status_code=503)):
+        with pytest.raises(requests.HTTPError):
+            parse_rss_feed(FEED_URL)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,122 +1,64 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
-from datetime import datetime, timezone
 from pathlib import Path
 
 functions_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(functions_dir))
 sys.path.insert(0, str(functions_dir.parent))
 
-from shared.token_validator import generate_token
-import azure.functions as func
 
-
-class MockHeaders:
-    def __init__(self, headers_dict):
-        self._headers = headers_dict
-    
-    def get(self, key, default=None):
-        return self._headers.get(key, default)
+def _bootstrap_env():
+    os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
+    os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
+    os.environ.setdefault('LOCAL_TABLES_PATH', './local-dev/tables')
+    os.environ.setdefault('STORAGE_CONTAINER', 'finnish-news-tools')
+    os.environ.setdefault('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
+    os.environ.setdefault('ADD_ORIGIN_RSS', 'true')
+    os.environ.setdefault('RSS_PARSER_DAILY_LIMIT', '50')
+    os.environ.setdefault('ARTICLE_SCRAPER_DAILY_LIMIT', '50')
+    os.environ.setdefault('RATE_LIMIT_TABLE_NAME', 'rateLimits')
+    os.environ.setdefault('CACHE_TTL_HOURS', '1')
+    os.environ.setdefault('AUTH_SECRET', 'test-secret-key-change-in-production')
+    config_path = Path(__file__).parent.parent / 'scraper-config.yaml.local'
+    template_path = Path(__file__).parent.parent / 'scraper-config.yaml.template'
+    os.environ.setdefault('SCRAPER_CONFIG_PATH', str(config_path if config_path.is_file() else template_path))
 
 
-class MockParams:
-    def __init__(self, params_dict):
-        self._params = params_dict
-    
-    def get(self, key, default=None):
-        return self._params.get(key, default)
+# Handler modules read their settings at import time, so the env has to be in place first.
+if __name__ == "__main__" or "PYTEST_CURRENT_TEST" in os.environ:
+    _bootstrap_env()
 
+from shared.json_utils import json_dumps
+from tests._request_helpers import MockHttpRequest, authenticate_user, create_auth_headers, parse_response
+from rss_feed_parser import rss_feed_parser
+from article_scraper import article_scraper
+from shared.storage_factory import get_blob_storage
 
-class MockHttpRequest:
-    def __init__(self, method='GET', params=None, body=None, headers=None):
-        self.method = method
-        self.params = MockParams(params or {})
-        self._body = body
-        self.headers = MockHeaders(headers or {})
-    
-    def get(self, key, default=None):
-        return self.params.get(key, default)
-    
-    def get_json(self):
-        if isinstance(self._body, dict):
-            return self._body
-        if isinstance(self._body, str):
-            return json.loads(self._body)
-        return self._body
-    
-    def get_header(self, name):
-        return self.headers.get(name)
-
-
-def authenticate_user(username: str, password: str) -> dict:
-    from authenticate import main as authenticate_main
-    
-    request = MockHttpRequest(
-        method='POST',
-        body={
-            "username": username,
-            "password": password
-        }
-    )
-    
-    response = authenticate_main(request)
-    
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
-    
-    if response.status_code == 200:
-        auth_data = json.loads(body_str)
-        return {
-            "token": auth_data["token"],
-            "username": auth_data["username"],
-            "issued_date": auth_data["issued_at"]
-        }
-    else:
-        error_data = json.loads(body_str)
-        raise ValueError(f"Authentication failed: {error_data.get('error', 'Unknown error')}")
-
-
-def create_auth_headers(auth_data: dict) -> dict:
-    return {
-        "X-Token": auth_data["token"],
-        "X-Username": auth_data["username"],
-        "X-Issued-Date": auth_data["issued_date"]
-    }
+rss_feed_parser_main = rss_feed_parser._function.get_user_function()
+article_scraper_main = article_scraper._function.get_user_function()
 
 
 def test_rss_feed_parser(auth_headers: dict):
-    from rss_feed_parser import main
-    
     request = MockHttpRequest(
         method='GET',
         headers=auth_headers
     )
     
-    response = main(request)
+    response = rss_feed_parser_main(request)
     
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
+    status_code, data = parse_response(response)
     
-    if response.status_code == 200:
-        return json.loads(body_str)
+    if status_code == 200:
+        return data
     else:
         return {
-            "error": body_str,
-            "status_code": response.status_code
+            "error": data.get('error', data),
+            "status_code": status_code
         }
 
 
 def test_article_scraper(auth_headers: dict, article_url: str):
-    from article_scraper import main
-    
     request = MockHttpRequest(
         method='POST',
         headers=auth_headers,
@@ -126,20 +68,16 @@ def test_article_scraper(auth_headers: dict, article_url: str):
         }
     )
     
-    response = main(request)
+    response = article_scraper_main(request)
     
-    body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
+    status_code, data = parse_response(response)
     
-    if response.status_code == 200:
-        return json.loads(body_str)
+    if status_code == 200:
+        return data
     else:
         return {
-            "error": body_str,
-            "status_code": response.status_code
+            "error": data.get('error', data),
+            "status_code": status_code
         }
 
 
@@ -180,13 +118,12 @@ def main():
         print("✓ RSS Feed fetched successfully")
         print()
         print("RSS Feed Result:")
-        print(json.dumps(rss_result, indent=2, ensure_ascii=False))
+        print(json_dumps(rss_result, indent=True).decode('utf-8'))
         print()
     
     first_article_url = None
     if "blob_path" in rss_result:
         try:
-            from shared.storage_factory import get_blob_storage
             storage = get_blob_storage()
             blob_path = rss_result["blob_path"]
             feed_data = storage.read_file(blob_path) if hasattr(storage, 'read_file') else None
@@ -219,7 +156,7 @@ def main():
             print("✓ Article scraped successfully")
             print()
             print("Article Scraper Result:")
-            print(json.dumps(article_result, indent=2, ensure_ascii=False))
+            print(json_dumps(article_result, indent=True).decode('utf-8'))
             print()
             
             if "results" in article_result and len(article_result["results"]) > 0:
@@ -231,14 +168,13 @@ def main():
                     print()
                     
                     try:
-                        from shared.storage_factory import get_blob_storage
                         storage = get_blob_storage()
                         article_blob_path = result["blob_path"]
                         article_data = storage.read_file(article_blob_path) if hasattr(storage, 'read_file') else None
                         
                         if article_data:
                             print("Article Content:")
-                            print(json.dumps(article_data, indent=2, ensure_ascii=False))
+                            print(json_dumps(article_data, indent=True).decode('utf-8'))
                         else:
                             print(f"Could not read article data from {article_blob_path}")
                     except Exception as e:
@@ -251,21 +187,4 @@ def main():
 
 
 if __name__ == "__main__":
-    os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
-    os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
-    os.environ.setdefault('LOCAL_TABLES_PATH', './local-dev/tables')
-    os.environ.setdefault('STORAGE_CONTAINER', 'finnish-news-tools')
-    os.environ.setdefault('RSS_FEED_URL', 'https://yle.fi/rss/uutiset/paauutiset')
-    os.environ.setdefault('ADD_ORIGIN_RSS', 'true')
-    os.environ.setdefault('RSS_PARSER_DAILY_LIMIT', '50')
-    os.environ.setdefault('ARTICLE_SCRAPER_DAILY_LIMIT', '50')
-    os.environ.setdefault('RATE_LIMIT_TABLE_NAME', 'rateLimits')
-    os.environ.setdefault('CACHE_TTL_HOURS', '1')
-    os.environ.setdefault('AUTH_SECRET', 'test-secret-key-change-in-production')
-    config_path = str(Path(__file__).parent.parent / 'scraper-config.yaml.local')
-    if os.path.exists(config_path):
-        os.environ.setdefault('SCRAPER_CONFIG_PATH', config_path)
-    else:
-        os.environ.setdefault('SCRAPER_CONFIG_PATH', str(Path(__file__).parent.parent / 'scraper-config.yaml.template'))
-    
     main()
@@ -2,6 +2,7 @@
 import os
 import sys
 import json
+from functools import lru_cache
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -9,11 +10,15 @@ functions_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(functions_dir))
 sys.path.insert(0, str(functions_dir.parent))
 
+from shared.json_utils import json_loads
 from shared.token_validator import generate_token
 import azure.functions as func
+from tests._testutil import load_local_settings
 
 
 class MockHeaders:
+    __slots__ = ('_headers',)
+    
     def __init__(self, headers_dict):
         self._headers = headers_dict
     
@@ -22,6 +27,8 @@ class MockHeaders:
 
 
 class MockParams:
+    __slots__ = ('_params',)
+    
     def __init__(self, params_dict):
         self._params = params_dict
     
@@ -30,20 +37,23 @@ class MockParams:
 
 
 class MockHttpRequest:
+    __slots__ = ('method', 'params', '_body', 'headers', '_json_cache')
+    
     def __init__(self, method='GET', params=None, body=None, headers=None):
         self.method = method
         self.params = MockParams(params or {})
         self._body = body
         self.headers = MockHeaders(headers or {})
+        self._json_cache = None
     
     def get(self, key, default=None):
         return self.params.get(key, default)
     
     def get_json(self):
-        if isinstance(self._body, dict):
-            return self._body
-        if isinstance(self._body, str):
-            return json.loads(self._body)
+        if isinstance(self._body, (str, bytes)):
+            if self._json_cache is None:
+                self._json_cache = json_loads(self._body)
+            return self._json_cache
         return self._body
     
     def get_header(self, name):
@@ -64,28 +74,25 @@ def authenticate_user(username: str, password: str) -> dict:
     response = authenticate_main(request)
     
     body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
     
     if response.status_code == 200:
-        auth_data = json.loads(body_str)
+        auth_data = json_loads(body_bytes)
         return {
             "token": auth_data["token"],
             "username": auth_data["username"],
             "issued_date": auth_data["issued_at"]
         }
     else:
-        error_data = json.loads(body_str)
+        error_data = json_loads(body_bytes)
         raise ValueError(f"Authentication failed: {error_data.get('error', 'Unknown error')}")
 
 
-def create_auth_headers(auth_data: dict) -> dict:
+@lru_cache(maxsize=32)
+def create_auth_headers(token: str, username: str, issued_date: str) -> dict:
     return {
-        "X-Token": auth_data["token"],
-        "X-Username": auth_data["username"],
-        "X-Issued-Date": auth_data["issued_date"]
+        "X-Token": token,
+        "X-Username": username,
+        "X-Issued-Date": issued_date
     }
 
 
@@ -106,16 +113,12 @@ def test_translate_article(auth_headers: dict, article_id: str, paragraphs: list
     response = main(request)
     
     body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
     
     if response.status_code == 200:
-        return json.loads(body_str)
+        return json_loads(body_bytes)
     else:
         return {
-            "error": body_str,
+            "error": body_bytes.decode('utf-8'),
             "status_code": response.status_code
         }
 
@@ -125,7 +128,7 @@ def get_scraped_article_paragraphs():
         from shared.storage_factory import get_blob_storage
         storage = get_blob_storage()
         
-        article_paths = storage.list_files('cache/yle/articles/') if hasattr(storage, 'list_files') else []
+        article_paths = storage.list_files('cache/yle/articles/', max_results=1) if hasattr(storage, 'list_files') else []
         if article_paths:
             article_data = storage.read_file(article_paths[0]) if hasattr(storage, 'read_file') else None
             if article_data and 'paragraphs' in article_data:
@@ -156,7 +159,7 @@ def main():
     print()
     print("Authenticating...")
     auth_data = authenticate_user(username, password)
-    auth_headers = create_auth_headers(auth_data)
+    auth_headers = create_auth_headers(auth_data['token'], auth_data['username'], auth_data['issued_date'])
     print(f"✓ Authenticated as: {auth_data['username']}")
     print()
     
@@ -264,6 +267,7 @@ def main():
     
     try:
         from shared.storage_factory import get_blob_storage
+        from translate_article.cache_manager import decode_entry
         storage = get_blob_storage()
         cache_path = 'cache/translations/'
         cache_files = storage.list_files(cache_path) if hasattr(storage, 'list_files') else []
@@ -272,6 +276,8 @@ def main():
         for cache_file in cache_files[:5]:
             print(f"  - {cache_file}")
             cache_data = storage.read_file(cache_file) if hasattr(storage, 'read_file') else None
+            if isinstance(cache_data, bytes):
+                cache_data = decode_entry(cache_data)
             if cache_data:
                 print(f"    Article ID: {cache_data.get('article_id')}")
                 print(f"    Languages: {cache_data.get('source_lang')} -> {cache_data.get('target_lang')}")
@@ -287,14 +293,7 @@ def main():
 
 
 if __name__ == "__main__":
-    local_settings_path = Path(__file__).parent.parent / 'local.settings.json.local'
-    if local_settings_path.exists():
-        with open(local_settings_path, 'r') as f:
-            local_settings = json.load(f)
-            values = local_settings.get('Values', {})
-            for key, value in values.items():
-                if key not in os.environ:
-                    os.environ[key] = str(value)
+    load_local_settings()
     
     os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
     os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import sys
+import time
+import threading
+import pytest
+from types import SimpleNamespace
+from pathlib import Path
+
+functions_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(functions_dir))
+sys.path.insert(0, str(functions_dir.parent))
+
+from translate_article.translator import AzureTranslatorWrapper, MAX_BATCH_ITEMS, MAX_CHUNK_CHARS
+
+
+def _ok(body):
+    return SimpleNamespace(status_code=200, json=lambda: [{'translations': [{'text': f"en:{item['text']}"}]} for item in body], text='')
+
+
+class FakeSession:
+    # Records every request body; `respond` maps a body to a response and defaults to an "en:" prefix per item
+    def __init__(self, respond=_ok):
+        self.respond = respond
+        self.bodies = []
+        self._lock = threading.Lock()
+    
+    def post(self, url, params=None, json=None, headers=None, timeout=None):
+        with self._lock:
+            self.bodies.append(json)
+        return self.respond(json)
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    monkeypatch.setenv('AZURE_TRANSLATOR_KEY', 'test-key')
+    monkeypatch.setenv('AZURE_TRANSLATOR_RETRY_DELAY', '0')
+    return AzureTranslatorWrapper('fi', 'en')
+
+
+@pytest.fixture
+def session(translator, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(translator, 'session', session)
+    return session
+
+
+def test_splits_at_max_batch_items(translator, session):
+    texts = [f"kappale {i}" for i in range(MAX_BATCH_ITEMS * 2 + 50)]
+    
+    assert translator.translate_batch(texts) == [f"en:{text}" for text in texts]
+    assert sorted(len(body) for body in session.bodies) == [50, MAX_BATCH_ITEMS, MAX_BATCH_ITEMS]
+
+
+def test_splits_at_max_chunk_chars(translator, session):
+    size = MAX_CHUNK_CHARS * 2 // 5
+    texts = [letter * size for letter in "abcde"]
+    
+    # Two paragraphs fit under the character limit, a third would not
+    assert translator.translate_batch(texts) == [f"en:{text}" for text in texts]
+    assert sorted(len(body) for body in session.bodies) == [1, 2, 2]
+    assert all(sum(len(item['text']) for item in body) <= MAX_CHUNK_CHARS for body in session.bodies)
+
+
+def test_results_keep_order_across_concurrent_chunks(translator, session):
+    def respond_slowly_first(body):
+        # Earlier chunks answer last, so completion order is the reverse of request order
+        index = int(body[0]['text'].split()[1])
+        time.sleep(0.02 if index < MAX_BATCH_ITEMS else 0.0)
+        return _ok(body)
+    
+    session.respond = respond_slowly_first
+    texts = [f"kappale {i}" for i in range(MAX_BATCH_ITEMS * 3)]
+    
+    assert translator.translate_batch(texts) == [f"en:{text}" for text in texts]
+    assert len(session.bodies) == 3
+
+
+def test_mismatched_response_falls_back_to_source(translator, session):
+    def drop_last(body):
+        response = _ok(body)
+        items = response.json()[:-1] if len(body) == MAX_BATCH_ITEMS else response.json()
+        return SimpleNamespace(status_code=200, json=lambda: items, text='')
+    
+    session.respond = drop_last
+    texts = [f"kappale {i}" for i in range(MAX_BATCH_ITEMS + 3)]
+    
+    # Only the chunk with the short response keeps its source text
+    result = translator.translate_batch(texts)
+    assert result[:MAX_BATCH_ITEMS] == texts[:MAX_BATCH_ITEMS]
+    assert result[MAX_BATCH_ITEMS:] == [f"en:{text}" for text in texts[MAX_BATCH_ITEMS:]]
+
+
+@pytest.mark.parametrize("status_code", [401, 400, 403, 404])
+def test_post_gives_up_on_client_errors(translator, session, status_code):
+    session.respond = lambda body: SimpleNamespace(status_code=status_code, json=lambda: None, text='error')
+    
+    assert translator._post([{'text': 'kappale'}]) is None
+    assert len(session.bodies) == 1
+    assert translator.translate('kappale') == 'kappale'
+
+
+def test_post_retries_server_errors(translator, session):
+    statuses = iter([503, 500])
+    
+    def flaky(body):
+        status_code = next(statuses, 200)
+        return _ok(body) if status_code == 200 else SimpleNamespace(status_code=status_code, text='busy')
+    
+    session.respond = flaky
+    assert translator._post([{'text': 'kappale'}]) == [{'translations': [{'text': 'en:kappale'}]}]
+    assert len(session.bodies) == 3
+
+
+def test_repeated_paragraphs_are_sent_once(translator, session):
+    texts = ["Yle Uutiset", "Ensimmäinen.", "Yle Uutiset", "Toinen.", "Ensimmäinen.", "Yle Uutiset"]
+    
+    assert translator.translate_batch(texts) == [f"en:{text}" for text in texts]
+    assert [item['text'] for body in session.bodies for item in body] == ["Yle Uutiset", "Ensimmäinen.", "Toinen."]
+
+
+def test_blank_paragraphs_pass_through(translator, session):
+    texts = ["", "Ensimmäinen.", "   ", "\n\t", "Ensimmäinen.", ""]
+    
+    assert translator.translate_batch(texts) == ["", "en:Ensimmäinen.", "   ", "\n\t", "en:Ensimmäinen.", ""]
+    assert [item['text'] for body in session.bodies for item in body] == ["Ensimmäinen."]
+
+
+def test_only_blank_paragraphs_skip_the_request(translator, session):
+    assert translator.translate_batch(["", "  "]) == ["", "  "]
+    assert session.bodies == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
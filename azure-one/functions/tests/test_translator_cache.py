@@ -2,6 +2,8 @@
 import os
 import sys
 import json
+import pytest
+from types import SimpleNamespace
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
@@ -13,7 +15,9 @@ os.environ.setdefault('USE_LOCAL_STORAGE', 'true')
 os.environ.setdefault('LOCAL_STORAGE_PATH', './local-dev/storage')
 os.environ.setdefault('STORAGE_CONTAINER', 'finnish-news-tools')
 
+from translate_article import cache_manager as cache_module
 from translate_article.cache_manager import TranslationCacheManager, hash_paragraphs
+from shared.local_storage import LocalBlobStorage
 
 
 def test_hash_paragraphs():
@@ -99,6 +103,121 @@ def test_cache_hit_on_repeated_request():
     print()
 
 
+class _FrozenDatetime(datetime):
+    current = None
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def frozen(monkeypatch):
+    monkeypatch.setattr(cache_module, 'datetime', _FrozenDatetime)
+    return _FrozenDatetime
+
+
+@pytest.fixture
+def disk_storage(tmp_path):
+    return LocalBlobStorage(str(tmp_path / "storage"))
+
+
+def _manager(storage, ttl_hours=24):
+    cache_manager = TranslationCacheManager(cache_ttl_hours=ttl_hours)
+    cache_manager.storage = storage
+    cache_manager.use_local = True
+    return cache_manager
+
+
+def _save_at(storage, frozen, when, article_id):
+    frozen.current = when
+    return _manager(storage).save(article_id, "fi", "en", [f"{article_id} kappale."], [f"{article_id} paragraph."])
+
+
+def test_entry_saved_yesterday_is_found(disk_storage, frozen):
+    blob_path = _save_at(disk_storage, frozen, datetime(2024, 1, 1, 23, 0, tzinfo=timezone.utc), "late-article")
+    assert "/2024-01-01/" in blob_path
+    
+    # A fresh manager has nothing in memory, so the hit has to come from yesterday's bucket
+    frozen.current = datetime(2024, 1, 2, 10, 0, tzinfo=timezone.utc)
+    cached_data = _manager(disk_storage).get("late-article", "fi", "en", ["late-article kappale."])
+    assert cached_data is not None
+    assert cached_data['translations'] == ["late-article paragraph."]
+
+
+def test_entry_past_ttl_in_yesterdays_bucket_is_missed(disk_storage, frozen):
+    _save_at(disk_storage, frozen, datetime(2024, 1, 1, 1, 0, tzinfo=timezone.utc), "early-article")
+    
+    frozen.current = datetime(2024, 1, 2, 10, 0, tzinfo=timezone.utc)
+    assert _manager(disk_storage).get("early-article", "fi", "en", ["early-article kappale."]) is None
+
+
+def test_cleanup_removes_old_and_legacy_buckets(disk_storage, frozen):
+    _save_at(disk_storage, frozen, datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc), "old-a")
+    _save_at(disk_storage, frozen, datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc), "old-b")
+    yesterday_path = _save_at(disk_storage, frozen, datetime(2024, 1, 2, 18, 0, tzinfo=timezone.utc), "yesterday")
+    today_path = _save_at(disk_storage, frozen, datetime(2024, 1, 3, 9, 0, tzinfo=timezone.utc), "today")
+    disk_storage.save_file("cache/translations/legacy-article/fi_en.json", {'translations': []})
+    
+    frozen.current = datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc)
+    cache_manager = _manager(disk_storage)
+    
+    # The 2024-01-01 bucket goes whole along with the undated legacy directory; nothing newer than the cutoff is touched
+    assert cache_manager.cleanup_expired() == 3
+    assert sorted(disk_storage.list_prefixes("cache/translations/")) == [
+        "cache/translations/2024-01-02/", "cache/translations/2024-01-03/"
+    ]
+    assert disk_storage.file_exists(yesterday_path)
+    assert disk_storage.file_exists(today_path)
+    assert cache_manager.get("today", "fi", "en", ["today kappale."]) is not None
+
+
+class _FakeContainer:
+    # Just enough of ContainerClient for the remote sweep: walk_blobs for the day buckets, list_blobs per bucket
+    def __init__(self, blobs, missing=()):
+        self.blobs = blobs
+        self.missing = set(missing)
+        self.deleted = []
+    
+    def walk_blobs(self, name_starts_with, delimiter):
+        buckets = sorted({name[:name.index('/', len(name_starts_with)) + 1] for name in self.blobs})
+        return [SimpleNamespace(name=bucket) for bucket in buckets]
+    
+    def list_blobs(self, name_starts_with, include=None):
+        return [
+            SimpleNamespace(name=name, metadata=metadata if include else None)
+            for name, metadata in self.blobs.items() if name.startswith(name_starts_with)
+        ]
+    
+    def delete_blobs(self, *names, raise_on_any_failure=True):
+        self.deleted.extend(names)
+        return iter([SimpleNamespace(status_code=404 if name in self.missing else 202) for name in names])
+
+
+def test_remote_cleanup_deletes_metadata_expired_entries_in_live_bucket(frozen):
+    frozen.current = datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc)
+    now_epoch = frozen.current.timestamp()
+    prefix = "cache/translations/"
+    container = _FakeContainer({
+        f"{prefix}2024-01-01/old/fi_en/a.json.zst": {},
+        f"{prefix}2024-01-03/stale/fi_en/b.json.zst": {'expires_at_epoch': str(now_epoch - 60)},
+        f"{prefix}2024-01-03/fresh/fi_en/c.json.zst": {'expires_at_epoch': str(now_epoch + 60)},
+        f"{prefix}2024-01-03/gone/fi_en/d.json.zst": {'expires_at_epoch': str(now_epoch - 60)},
+    }, missing=[f"{prefix}2024-01-03/gone/fi_en/d.json.zst"])
+    
+    cache_manager = TranslationCacheManager(cache_ttl_hours=24)
+    cache_manager.use_local = False
+    cache_manager.storage = SimpleNamespace(get_container_client=lambda name: container)
+    
+    # The blob another sweep already removed comes back 404 and is not counted
+    assert cache_manager.cleanup_expired() == 2
+    assert sorted(container.deleted) == [
+        f"{prefix}2024-01-01/old/fi_en/a.json.zst",
+        f"{prefix}2024-01-03/gone/fi_en/d.json.zst",
+        f"{prefix}2024-01-03/stale/fi_en/b.json.zst",
+    ]
+
+
 def main():
     print("=" * 60)
     print("Translation Cache Manager Tests")
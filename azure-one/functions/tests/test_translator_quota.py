@@ -2,6 +2,7 @@
 import os
 import sys
 import json
+from functools import lru_cache
 from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
@@ -12,9 +13,12 @@ sys.path.insert(0, str(functions_dir.parent))
 
 from shared.token_validator import generate_token
 import azure.functions as func
+from tests._testutil import load_local_settings
 
 
 class MockHeaders:
+    __slots__ = ('_headers',)
+    
     def __init__(self, headers_dict):
         self._headers = headers_dict
     
@@ -23,6 +27,8 @@ class MockHeaders:
 
 
 class MockParams:
+    __slots__ = ('_params',)
+    
     def __init__(self, params_dict):
         self._params = params_dict
     
@@ -31,6 +37,8 @@ class MockParams:
 
 
 class MockHttpRequest:
+    __slots__ = ('method', 'params', '_body', 'headers')
+    
     def __init__(self, method='GET', params=None, body=None, headers=None):
         self.method = method
         self.params = MockParams(params or {})
@@ -65,28 +73,25 @@ def authenticate_user(username: str, password: str) -> dict:
     response = authenticate_func(request)
     
     body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
     
     if response.status_code == 200:
-        auth_data = json.loads(body_str)
+        auth_data = json.loads(body_bytes)
         return {
             "token": auth_data["token"],
             "username": auth_data["username"],
             "issued_date": auth_data["issued_at"]
         }
     else:
-        error_data = json.loads(body_str)
+        error_data = json.loads(body_bytes)
         raise ValueError(f"Authentication failed: {error_data.get('error', 'Unknown error')}")
 
 
-def create_auth_headers(auth_data: dict) -> dict:
+@lru_cache(maxsize=32)
+def create_auth_headers(token: str, username: str, issued_date: str) -> dict:
     return {
-        "X-Token": auth_data["token"],
-        "X-Username": auth_data["username"],
-        "X-Issued-Date": auth_data["issued_date"]
+        "X-Token": token,
+        "X-Username": username,
+        "X-Issued-Date": issued_date
     }
 
 
@@ -124,18 +129,14 @@ def test_translator_quota_mocked(auth_headers: dict):
         response = translator_quota(request)
         
         body_bytes = response.get_body()
-        if isinstance(body_bytes, bytes):
-            body_str = body_bytes.decode('utf-8')
-        else:
-            body_str = str(body_bytes)
         
         if response.status_code == 200:
-            quota_data = json.loads(body_str)
+            quota_data = json.loads(body_bytes)
             print("\n=== Translator Quota (Mocked) ===")
             print(json.dumps(quota_data, indent=2))
             return quota_data
         else:
-            error_data = json.loads(body_str)
+            error_data = json.loads(body_bytes)
             print(f"\n=== Error ===")
             print(json.dumps(error_data, indent=2))
             raise ValueError(f"Quota query failed: {error_data.get('error', 'Unknown error')}")
@@ -171,18 +172,14 @@ def test_translator_quota_real(auth_headers: dict):
     response = translator_quota(request)
     
     body_bytes = response.get_body()
-    if isinstance(body_bytes, bytes):
-        body_str = body_bytes.decode('utf-8')
-    else:
-        body_str = str(body_bytes)
     
     if response.status_code == 200:
-        quota_data = json.loads(body_str)
+        quota_data = json.loads(body_bytes)
         print("\n=== Translator Quota (Real Azure Monitor) ===")
         print(json.dumps(quota_data, indent=2))
         return quota_data
     else:
-        error_data = json.loads(body_str)
+        error_data = json.loads(body_bytes)
         print(f"\n=== Error ===")
         print(json.dumps(error_data, indent=2))
         print("\nNote: This might be a permissions issue.")
@@ -190,17 +187,6 @@ def test_translator_quota_real(auth_headers: dict):
         raise ValueError(f"Quota query failed: {error_data.get('error', 'Unknown error')}")
 
 
-def load_local_settings():
-    settings_file = Path(__file__).parent.parent / 'local.settings.json.local'
-    if settings_file.exists():
-        with open(settings_file, 'r') as f:
-            settings = json.load(f)
-            if 'Values' in settings:
-                for key, value in settings['Values'].items():
-                    if key not in os.environ:
-                        os.environ[key] = str(value)
-
-
 def main():
     load_local_settings()
     
@@ -220,7 +206,7 @@ def main():
         auth_data = authenticate_user(username, password)
         print(f"\n✓ Authenticated as {auth_data['username']}")
         
-        auth_headers = create_auth_headers(auth_data)
+        auth_headers = create_auth_headers(auth_data['token'], auth_data['username'], auth_data['issued_date'])
         
         resource_id = os.getenv('AZURE_TRANSLATOR_RESOURCE_ID', '')
         use_real = resource_id and not resource_id.startswith('/subscriptions/{') and '{sub}' not in resource_id and '/test/' not in resource_id
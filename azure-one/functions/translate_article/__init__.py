@@ -1,23 +1,64 @@
 import azure.functions as func
-import json
 import os
+import time
 import logging
+import threading
 from datetime import datetime, timezone
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import validate_request
-    from ..shared.rate_limiter import DailyRateLimiter
+    from ..shared.rate_limiter import CachedRateLimiter, DailyRateLimiter
     from .cache_manager import TranslationCacheManager
     from .translator import AzureTranslatorWrapper
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import validate_request
-    from shared.rate_limiter import DailyRateLimiter
+    from shared.rate_limiter import CachedRateLimiter, DailyRateLimiter
     from translate_article.cache_manager import TranslationCacheManager
     from translate_article.translator import AzureTranslatorWrapper
 
 logger = logging.getLogger(__name__)
 
+DAILY_LIMIT = int(os.getenv('TRANSLATION_DAILY_LIMIT', '50'))
+CACHE_TTL_HOURS = int(os.getenv('TRANSLATION_CACHE_TTL_HOURS', '24'))
+CLEANUP_INTERVAL_SECONDS = int(os.getenv('TRANSLATION_CACHE_CLEANUP_INTERVAL_SECONDS', '600'))
+
+# Reused across invocations on a warm instance
+_rate_limiter = None
+_cache_manager = None
+_clients_lock = threading.Lock()
+_last_cleanup = None
+_cleanup_lock = threading.Lock()
+
+
+def _get_rate_limiter() -> CachedRateLimiter:
+    global _rate_limiter
+    with _clients_lock:
+        if _rate_limiter is None:
+            _rate_limiter = CachedRateLimiter(DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits')))
+        return _rate_limiter
+
+
+def _get_cache_manager() -> TranslationCacheManager:
+    global _cache_manager
+    with _clients_lock:
+        if _cache_manager is None:
+            _cache_manager = TranslationCacheManager(CACHE_TTL_HOURS)
+        return _cache_manager
+
+
+def _cleanup_in_background(cache_manager: TranslationCacheManager):
+    # The sweep lists and reads every cached translation, so it runs at most once per interval and off the request path
+    global _last_cleanup
+    now = time.monotonic()
+    with _cleanup_lock:
+        if _last_cleanup is not None and now - _last_cleanup < CLEANUP_INTERVAL_SECONDS:
+            return
+        _last_cleanup = now
+    threading.Thread(target=cache_manager.cleanup_expired, daemon=True).start()
+
 
 @app.route(route="translate-article", auth_level=func.AuthLevel.ANONYMOUS, methods=["POST"])
 def translate_article(req: func.HttpRequest) -> func.HttpResponse:
@@ -27,19 +68,19 @@ def translate_article(req: func.HttpRequest) -> func.HttpResponse:
     if not is_valid:
         logger.warning(f"Authentication failed: {username_or_error}")
         return func.HttpResponse(
-            json.dumps({"error": "Authentication required"}),
+            json_dumps({"error": "Authentication required"}),
             status_code=401,
             mimetype="application/json"
         )
     
-    rate_limiter = DailyRateLimiter(os.getenv('RATE_LIMIT_TABLE_NAME', 'rateLimits'))
-    daily_limit = int(os.getenv('TRANSLATION_DAILY_LIMIT', '50'))
+    rate_limiter = _get_rate_limiter()
+    daily_limit = DAILY_LIMIT
     
     if not rate_limiter.check_limit('translate_article', daily_limit):
         current_count = rate_limiter.get_daily_count('translate_article')
         logger.warning(f"Rate limit exceeded for translate_article: {current_count}/{daily_limit}")
         return func.HttpResponse(
-            json.dumps({
+            json_dumps({
                 "error": "Rate limit exceeded",
                 "current_count": current_count,
                 "daily_limit": daily_limit
@@ -52,7 +93,7 @@ def translate_article(req: func.HttpRequest) -> func.HttpResponse:
         body = req.get_json()
         if not body:
             return func.HttpResponse(
-                json.dumps({"error": "Request body required"}),
+                json_dumps({"error": "Request body required"}),
                 status_code=400,
                 mimetype="application/json"
             )
@@ -64,23 +105,21 @@ def translate_article(req: func.HttpRequest) -> func.HttpResponse:
         
         if not article_id or not paragraphs:
             return func.HttpResponse(
-                json.dumps({"error": "article_id and paragraphs required"}),
+                json_dumps({"error": "article_id and paragraphs required"}),
                 status_code=400,
                 mimetype="application/json"
             )
         
         logger.info(f"Translation requested: {article_id} {source_lang}->{target_lang}, {len(paragraphs)} paragraphs")
         
-        cache_ttl_hours = int(os.getenv('TRANSLATION_CACHE_TTL_HOURS', '24'))
-        cache_manager = TranslationCacheManager(cache_ttl_hours)
-        
-        cache_manager.cleanup_expired()
+        cache_manager = _get_cache_manager()
+        _cleanup_in_background(cache_manager)
         
         cached_data = cache_manager.get(article_id, source_lang, target_lang, paragraphs)
         if cached_data:
             logger.info(f"Returning cached translation for {article_id}")
             return func.HttpResponse(
-                json.dumps({
+                json_dumps({
                     "article_id": article_id,
                     "source_lang": source_lang,
                     "target_lang": target_lang,
@@ -101,7 +140,7 @@ def translate_article(req: func.HttpRequest) -> func.HttpResponse:
         
         now = datetime.now(timezone.utc)
         return func.HttpResponse(
-            json.dumps({
+            json_dumps({
                 "article_id": article_id,
                 "source_lang": source_lang,
                 "target_lang": target_lang,
@@ -116,7 +155,7 @@ def translate_article(req: func.HttpRequest) -> func.HttpResponse:
     except Exception as e:
         logger.error(f"Error in translate_article function: {e}", exc_info=True)
         return func.HttpResponse(
-            json.dumps({"error": str(e)}),
+            json_dumps({"error": str(e)}),
             status_code=500,
             mimetype="application/json"
         )
@@ -1,20 +1,86 @@
 import os
-import json
+import asyncio
 import hashlib
+import time
 import logging
-from datetime import datetime, timezone, timedelta
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List
+from azure.storage.blob import ContentSettings
 try:
-    from ..shared.storage_factory import get_blob_storage
+    from ..shared.json_utils import json_dumps, json_loads
+    from ..shared.storage_factory import get_blob_storage, get_async_container_client
+    from ..shared.time_utils import parse_iso
 except ImportError:
-    from shared.storage_factory import get_blob_storage
+    from shared.json_utils import json_dumps, json_loads
+    from shared.storage_factory import get_blob_storage, get_async_container_client
+    from shared.time_utils import parse_iso
+
+# Cache-key hash only, no cryptographic requirement; blake2b is the stdlib fallback
+try:
+    from xxhash import xxh3_128 as _paragraph_hasher
+except ImportError:
+    def _paragraph_hasher():
+        return hashlib.blake2b(digest_size=16)
+
+# Cached translations are natural text plus repeated JSON keys, so zstd roughly halves what is stored and downloaded
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+ZSTD_LEVEL = 3
+CACHE_SUFFIX = '.json.zst' if zstandard is not None else '.json'
+MEMORY_CACHE_SIZE = 512
+# Content-Encoding marks zstd bodies for anything that fetches the blob directly; this module decodes them itself
+_CONTENT_SETTINGS = ContentSettings(
+    content_type='application/json',
+    content_encoding='zstd' if zstandard is not None else None
+)
+
+# Azure's blob batch API accepts at most 256 deletes per request
+DELETE_BATCH_SIZE = 256
+CLEANUP_WORKERS = int(os.getenv('TRANSLATION_CACHE_CLEANUP_WORKERS', '16'))
+
 
 def hash_paragraphs(paragraphs: List[str]) -> str:
-    content = '\n'.join(paragraphs)
-    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    # One join and one encode in C instead of two update() calls per paragraph; each paragraph ends with \x1f
+    hasher = _paragraph_hasher()
+    if paragraphs:
+        hasher.update(('\x1f'.join(paragraphs) + '\x1f').encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def encode_entry(cache_data: Dict[str, Any]) -> bytes:
+    data = json_dumps(cache_data)
+    if zstandard is not None:
+        # Compressor objects are not safe to share between threads, and are cheap to build
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decode_entry(data: bytes) -> Dict[str, Any]:
+    if zstandard is not None:
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json_loads(data)
+
+
+def _expiry_epoch(values: Dict[str, Any]) -> Optional[float]:
+    # Accepts a cache entry or blob metadata; entries written before expires_at_epoch existed fall back to the ISO string
+    epoch = values.get('expires_at_epoch')
+    if epoch is not None:
+        return float(epoch)
+    expires_at = values.get('expires_at')
+    return parse_iso(expires_at).timestamp() if expires_at else None
+
+
+def _metadata_expired(metadata: Optional[Dict[str, str]], now_epoch: float) -> bool:
+    expiry = _expiry_epoch(metadata or {})
+    return expiry is not None and expiry < now_epoch
 
 
 class TranslationCacheManager:
@@ -24,72 +90,107 @@ class TranslationCacheManager:
         self.cache_ttl_hours = cache_ttl_hours
         self.use_local = os.getenv('USE_LOCAL_STORAGE', 'false').lower() == 'true'
         self.cache_prefix = 'cache/translations/'
+        # Parsed entries kept in process memory, so repeat requests on a warm instance skip the download and parse
+        self._memory = OrderedDict()
+        self._memory_lock = threading.RLock()
         logger.info(f"Initialized TranslationCacheManager with TTL: {cache_ttl_hours}h")
     
-    def _get_cache_key(self, article_id: str, source_lang: str, target_lang: str) -> str:
-        return f"{article_id}/{source_lang}_{target_lang}"
+    def _get_cache_key(self, article_id: str, source_lang: str, target_lang: str, paragraph_hash: str) -> str:
+        # The hash is part of the name, so changed paragraphs are a plain miss instead of a download and compare
+        return f"{article_id}/{source_lang}_{target_lang}/{paragraph_hash}"
     
-    def _get_blob_path(self, cache_key: str) -> str:
-        return f"{self.cache_prefix}{cache_key}.json"
+    def _get_blob_path(self, cache_key: str, bucket: str) -> str:
+        return f"{self.cache_prefix}{bucket}/{cache_key}{CACHE_SUFFIX}"
     
-    def get(self, article_id: str, source_lang: str, target_lang: str, paragraphs: List[str]) -> Optional[Dict[str, Any]]:
-        cache_key = self._get_cache_key(article_id, source_lang, target_lang)
-        blob_path = self._get_blob_path(cache_key)
-        paragraph_hash = hash_paragraphs(paragraphs)
-        
+    def _live_buckets(self, now: datetime) -> List[str]:
+        # Entries are bucketed by the day they were written, so only the last ceil(ttl / 24) days can still be valid
+        today = now.date()
+        days = -(-self.cache_ttl_hours // 24)
+        return [(today - timedelta(days=offset)).isoformat() for offset in range(days + 1)]
+    
+    def _read(self, blob_path: str, now_epoch: float) -> Optional[Dict[str, Any]]:
         if self.use_local:
             if not self.storage.file_exists(blob_path):
                 return None
-            
             cache_data = self.storage.read_file(blob_path)
-            if not cache_data or not isinstance(cache_data, dict):
+            if isinstance(cache_data, bytes):
+                return decode_entry(cache_data)
+            return cache_data if isinstance(cache_data, dict) else None
+        
+        container = self.storage.get_container_client(self.container_name)
+        try:
+            downloader = container.get_blob_client(blob_path).download_blob(decompress=False)
+            # expires_at arrives as metadata in the response headers, so an expired entry is never decompressed or parsed
+            if _metadata_expired(downloader.properties.metadata, now_epoch):
+                logger.debug(f"Cache expired for {blob_path}")
                 return None
-            
-            if 'expires_at' in cache_data:
-                expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                if expires_at < datetime.now(timezone.utc):
-                    logger.debug(f"Cache expired for {blob_path}")
-                    return None
-            
-            cached_hash = cache_data.get('paragraph_hash')
-            if cached_hash != paragraph_hash:
-                logger.debug(f"Paragraph hash mismatch for {blob_path}")
+            return decode_entry(downloader.readall())
+        except Exception as e:
+            logger.debug(f"Cache miss for {blob_path}: {e}")
+            return None
+    
+    def _memory_get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
                 return None
+            expires_epoch, cache_data = entry
+            if expires_epoch is not None and expires_epoch < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return cache_data
+    
+    def _memory_put(self, key: tuple, cache_data: Dict[str, Any]):
+        expires_epoch = _expiry_epoch(cache_data)
+        with self._memory_lock:
+            self._memory[key] = (expires_epoch, cache_data)
+            self._memory.move_to_end(key)
+            if len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+    
+    def _memory_prune(self):
+        now_epoch = time.time()
+        with self._memory_lock:
+            for key in [k for k, (expires_epoch, _) in self._memory.items()
+                        if expires_epoch is not None and expires_epoch < now_epoch]:
+                del self._memory[key]
+    
+    def get(self, article_id: str, source_lang: str, target_lang: str, paragraphs: List[str]) -> Optional[Dict[str, Any]]:
+        paragraph_hash = hash_paragraphs(paragraphs)
+        memory_key = (article_id, source_lang, target_lang, paragraph_hash)
+        cache_data = self._memory_get(memory_key)
+        if cache_data is not None:
+            return cache_data
+        
+        cache_key = self._get_cache_key(article_id, source_lang, target_lang, paragraph_hash)
+        now = datetime.now(timezone.utc)
+        now_epoch = now.timestamp()
+        
+        for bucket in self._live_buckets(now):
+            blob_path = self._get_blob_path(cache_key, bucket)
+            cache_data = self._read(blob_path, now_epoch)
+            if not cache_data:
+                continue
+            
+            expires_epoch = _expiry_epoch(cache_data)
+            if expires_epoch is not None and expires_epoch < now_epoch:
+                logger.debug(f"Cache expired for {blob_path}")
+                continue
             
             logger.info(f"Cache hit for {blob_path}")
+            self._memory_put(memory_key, cache_data)
             return cache_data
-        else:
-            container = self.storage.get_container_client(self.container_name)
-            blob_client = container.get_blob_client(blob_path)
-            
-            try:
-                blob_data = blob_client.download_blob().readall()
-                cache_data = json.loads(blob_data.decode('utf-8'))
-                
-                if 'expires_at' in cache_data:
-                    expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                    if expires_at < datetime.now(timezone.utc):
-                        logger.debug(f"Cache expired for {blob_path}")
-                        return None
-                
-                cached_hash = cache_data.get('paragraph_hash')
-                if cached_hash != paragraph_hash:
-                    logger.debug(f"Paragraph hash mismatch for {blob_path}")
-                    return None
-                
-                logger.info(f"Cache hit for {blob_path}")
-                return cache_data
-            except Exception as e:
-                logger.debug(f"Cache miss for {blob_path}: {e}")
-                return None
+        
+        return None
     
     def save(self, article_id: str, source_lang: str, target_lang: str, 
              paragraphs: List[str], translations: List[str]) -> str:
-        cache_key = self._get_cache_key(article_id, source_lang, target_lang)
-        blob_path = self._get_blob_path(cache_key)
         paragraph_hash = hash_paragraphs(paragraphs)
+        cache_key = self._get_cache_key(article_id, source_lang, target_lang, paragraph_hash)
         
         now = datetime.now(timezone.utc)
+        blob_path = self._get_blob_path(cache_key, now.date().isoformat())
         expires_at = now + timedelta(hours=self.cache_ttl_hours)
         
         cache_data = {
@@ -101,65 +202,121 @@ class TranslationCacheManager:
             'paragraph_hash': paragraph_hash,
             'created_at': now.isoformat(),
             'expires_at': expires_at.isoformat(),
+            'expires_at_epoch': expires_at.timestamp(),
             'cache_ttl_hours': self.cache_ttl_hours
         }
         
         if self.use_local:
-            self.storage.save_file(blob_path, cache_data)
+            self.storage.save_file(blob_path, encode_entry(cache_data))
         else:
             container = self.storage.get_container_client(self.container_name)
             blob_client = container.get_blob_client(blob_path)
             blob_client.upload_blob(
-                json.dumps(cache_data, indent=2, ensure_ascii=False),
+                encode_entry(cache_data),
                 overwrite=True,
-                encoding='utf-8'
+                content_settings=_CONTENT_SETTINGS,
+                metadata={
+                    'expires_at': cache_data['expires_at'],
+                    'expires_at_epoch': str(cache_data['expires_at_epoch']),
+                    'paragraph_hash': paragraph_hash
+                }
             )
         
+        self._memory_put((article_id, source_lang, target_lang, paragraph_hash), cache_data)
         logger.info(f"Saved translation cache to {blob_path}")
         return blob_path
     
+    def _is_expired_bucket(self, bucket: str, cutoff: date) -> bool:
+        try:
+            return date.fromisoformat(bucket) < cutoff
+        except ValueError:
+            # Entries from before date bucketing are never read again
+            return True
+    
+    def _delete_batch(self, container, names: List[str]) -> int:
+        try:
+            # One missing blob must not fail the batch; only the sub-responses that succeeded are counted
+            responses = container.delete_blobs(*names, raise_on_any_failure=False)
+            return sum(1 for response in responses if response.status_code < 300)
+        except Exception as e:
+            logger.warning(f"Error deleting {len(names)} expired cache blobs starting at {names[0]}: {e}")
+            return 0
+    
     def cleanup_expired(self) -> int:
         logger.info(f"Cleaning up expired translation cache entries")
         cleaned_count = 0
+        # A day's bucket is dropped whole once the last entry written that day is past its TTL; no entry is read
+        now = datetime.now(timezone.utc)
+        now_epoch = now.timestamp()
+        cutoff = (now - timedelta(hours=self.cache_ttl_hours)).date()
+        self._memory_prune()
         
         if self.use_local:
-            files = self.storage.list_files(self.cache_prefix)
-            for blob_path in files:
-                if not blob_path.endswith('.json'):
-                    continue
-                
-                try:
-                    cache_data = self.storage.read_file(blob_path)
-                    if cache_data and isinstance(cache_data, dict):
-                        if 'expires_at' in cache_data:
-                            expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                            if expires_at < datetime.now(timezone.utc):
-                                self.storage.delete_file(blob_path)
-                                cleaned_count += 1
-                                logger.debug(f"Deleted expired cache: {blob_path}")
-                except Exception as e:
-                    logger.warning(f"Error checking cache expiration for {blob_path}: {e}")
+            for prefix in self.storage.list_prefixes(self.cache_prefix):
+                if self._is_expired_bucket(prefix[len(self.cache_prefix):-1], cutoff):
+                    cleaned_count += self.storage.delete_prefix(prefix)
         else:
             container = self.storage.get_container_client(self.container_name)
-            blobs = container.list_blobs(name_starts_with=self.cache_prefix)
+            names = []
+            for item in container.walk_blobs(name_starts_with=self.cache_prefix, delimiter='/'):
+                if not item.name.endswith('/'):
+                    continue
+                if self._is_expired_bucket(item.name[len(self.cache_prefix):-1], cutoff):
+                    names.extend(blob.name for blob in container.list_blobs(name_starts_with=item.name))
+                else:
+                    # Live buckets still hold entries past their own TTL; expires_at comes back with the listing
+                    names.extend(
+                        blob.name
+                        for blob in container.list_blobs(name_starts_with=item.name, include=['metadata'])
+                        if _metadata_expired(blob.metadata, now_epoch)
+                    )
             
-            for blob in blobs:
-                if not blob.name.endswith('.json'):
+            batches = [names[start:start + DELETE_BATCH_SIZE] for start in range(0, len(names), DELETE_BATCH_SIZE)]
+            if batches:
+                # Each batch is one round-trip; the container client is thread-safe and shares the pooled transport
+                with ThreadPoolExecutor(max_workers=min(CLEANUP_WORKERS, len(batches))) as executor:
+                    cleaned_count = sum(executor.map(lambda batch: self._delete_batch(container, batch), batches))
+        
+        if cleaned_count > 0:
+            logger.info(f"Cleaned up {cleaned_count} expired translation cache entries")
+        return cleaned_count
+    
+    async def cleanup_expired_async(self, max_concurrency: int = CLEANUP_WORKERS) -> int:
+        if self.use_local:
+            return self.cleanup_expired()
+        
+        logger.info(f"Cleaning up expired translation cache entries (async)")
+        now = datetime.now(timezone.utc)
+        now_epoch = now.timestamp()
+        cutoff = (now - timedelta(hours=self.cache_ttl_hours)).date()
+        self._memory_prune()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async with get_async_container_client(self.container_name) as container:
+            names = []
+            async for item in container.walk_blobs(name_starts_with=self.cache_prefix, delimiter='/'):
+                if not item.name.endswith('/'):
                     continue
-                
-                try:
-                    blob_client = container.get_blob_client(blob.name)
-                    blob_data = blob_client.download_blob().readall()
-                    cache_data = json.loads(blob_data.decode('utf-8'))
-                    
-                    if 'expires_at' in cache_data:
-                        expires_at = datetime.fromisoformat(cache_data['expires_at'].replace('Z', '+00:00'))
-                        if expires_at < datetime.now(timezone.utc):
-                            blob_client.delete_blob()
-                            cleaned_count += 1
-                            logger.debug(f"Deleted expired cache: {blob.name}")
-                except Exception as e:
-                    logger.warning(f"Error checking cache expiration for {blob.name}: {e}")
+                if self._is_expired_bucket(item.name[len(self.cache_prefix):-1], cutoff):
+                    names.extend([blob.name async for blob in container.list_blobs(name_starts_with=item.name)])
+                else:
+                    names.extend([
+                        blob.name
+                        async for blob in container.list_blobs(name_starts_with=item.name, include=['metadata'])
+                        if _metadata_expired(blob.metadata, now_epoch)
+                    ])
+            
+            async def delete(batch: List[str]) -> int:
+                async with semaphore:
+                    try:
+                        responses = await container.delete_blobs(*batch, raise_on_any_failure=False)
+                        return sum([1 async for response in responses if response.status_code < 300])
+                    except Exception as e:
+                        logger.warning(f"Error deleting {len(batch)} expired cache blobs starting at {batch[0]}: {e}")
+                        return 0
+            
+            batches = [names[start:start + DELETE_BATCH_SIZE] for start in range(0, len(names), DELETE_BATCH_SIZE)]
+            cleaned_count = sum(await asyncio.gather(*(delete(batch) for batch in batches)))
         
         if cleaned_count > 0:
             logger.info(f"Cleaned up {cleaned_count} expired translation cache entries")
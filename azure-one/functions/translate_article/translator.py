@@ -2,10 +2,49 @@ import os
 import time
 import requests
 import logging
-from typing import List
+import threading
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Translator accepts up to 100 array elements and 50k characters per request
+MAX_BATCH_ITEMS = 100
+MAX_CHUNK_CHARS = 50000
+# Chunks are independent POSTs, so long articles send them concurrently
+MAX_TRANSLATE_WORKERS = 8
+
+# Wrappers are built per request; the session outlives them so keep-alive connections carry over between invocations
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_TRANSLATE_WORKERS)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def _pack_chunks(texts: List[str], limit: int = MAX_CHUNK_CHARS, max_items: int = MAX_BATCH_ITEMS) -> Iterator[List[str]]:
+    chunk = []
+    size = 0
+    for text in texts:
+        if chunk and (size + len(text) > limit or len(chunk) >= max_items):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(text)
+        size += len(text)
+    if chunk:
+        yield chunk
+
 
 class AzureTranslatorWrapper:
     def __init__(self, source_lang: str, target_lang: str):
@@ -25,6 +64,9 @@ class AzureTranslatorWrapper:
         if not self.subscription_key:
             raise ValueError("AZURE_TRANSLATOR_KEY environment variable not set")
         
+        self.session = _get_session()
+        self.headers = self._get_headers()
+        
         logger.info(f"Initialized AzureTranslatorWrapper: {source_lang} -> {target_lang}")
     
     def _get_headers(self) -> dict:
@@ -36,35 +78,25 @@ class AzureTranslatorWrapper:
             headers['Ocp-Apim-Subscription-Region'] = self.region
         return headers
     
-    def translate(self, text: str) -> str:
-        if not text or not text.strip():
-            return text
-        
+    def _post(self, body: List[dict]) -> Optional[list]:
         params = {
             'api-version': '3.0',
             'from': self.source_lang,
             'to': self.target_lang
         }
         
-        body = [{'text': text}]
-        
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
                     params=params,
                     json=body,
-                    headers=self._get_headers(),
+                    headers=self.headers,
                     timeout=self.timeout
                 )
                 
                 if response.status_code == 200:
-                    result = response.json()
-                    if result and len(result) > 0 and 'translations' in result[0]:
-                        return result[0]['translations'][0]['text']
-                    else:
-                        logger.warning(f"Unexpected response format: {result}")
-                        return text
+                    return response.json()
                 elif response.status_code == 429:
                     wait_time = self.retry_delay * (attempt + 1) * 2
                     logger.warning(f"Rate limited. Waiting {wait_time} seconds before retry...")
@@ -72,14 +104,14 @@ class AzureTranslatorWrapper:
                     continue
                 elif response.status_code == 401:
                     logger.error(f"Authentication failed: {response.status_code} - {response.text}")
-                    return text
+                    return None
                 elif response.status_code >= 500:
                     logger.warning(f"Server error {response.status_code}. Retrying in {self.retry_delay} seconds...")
                     time.sleep(self.retry_delay)
                     continue
                 else:
                     logger.error(f"Translation failed: {response.status_code} - {response.text}")
-                    return text
+                    return None
                     
             except requests.exceptions.Timeout:
                 logger.warning(f"Request timeout. Attempt {attempt + 1}/{self.max_retries}")
@@ -88,7 +120,7 @@ class AzureTranslatorWrapper:
                     continue
                 else:
                     logger.error("Max retries reached. Returning original text.")
-                    return text
+                    return None
                     
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request error: {e}. Attempt {attempt + 1}/{self.max_retries}")
@@ -97,14 +129,50 @@ class AzureTranslatorWrapper:
                     continue
                 else:
                     logger.error("Max retries reached. Returning original text.")
-                    return text
+                    return None
             
             except Exception as e:
                 logger.error(f"Unexpected error: {e}")
-                return text
+                return None
         
         logger.error("Translation failed after all retries. Returning original text.")
-        return text
+        return None
+    
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
     
     def translate_batch(self, texts: List[str]) -> List[str]:
-        return [self.translate(text) for text in texts]
+        # Repeated paragraphs (bylines, footers) are translated and billed once, then fanned back out
+        unique = {}
+        for text in texts:
+            unique.setdefault(text, len(unique))
+        translated = self._translate_unique(list(unique))
+        return [translated[unique[text]] for text in texts]
+    
+    def _translate_unique(self, texts: List[str]) -> List[str]:
+        results = {text: text for text in texts if not text or not text.strip()}
+        chunks = list(_pack_chunks([text for text in texts if text not in results]))
+        
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_TRANSLATE_WORKERS, len(chunks))) as executor:
+                translated_chunks = list(executor.map(self._translate_chunk, chunks))
+        else:
+            translated_chunks = [self._translate_chunk(chunk) for chunk in chunks]
+        
+        for chunk, translated in zip(chunks, translated_chunks):
+            results.update(zip(chunk, translated))
+        return [results[text] for text in texts]
+    
+    def _translate_chunk(self, chunk: List[str]) -> List[str]:
+        # One array body per chunk; the response lists translations in request order
+        result = self._post([{'text': text} for text in chunk])
+        if not result or len(result) != len(chunk):
+            if result:
+                logger.warning(f"Unexpected response format: {len(result)} results for {len(chunk)} paragraphs")
+            return chunk
+        
+        translated = []
+        for text, item in zip(chunk, result):
+            translations = item.get('translations') if isinstance(item, dict) else None
+            translated.append(translations[0]['text'] if translations else text)
+        return translated
@@ -1,13 +1,16 @@
 import azure.functions as func
-import json
 import os
+import time
 import logging
+import threading
 from datetime import datetime, timezone, timedelta
 try:
     from ..shared.app import app
+    from ..shared.json_utils import json_dumps
     from ..shared.token_validator import validate_request
 except ImportError:
     from shared.app import app
+    from shared.json_utils import json_dumps
     from shared.token_validator import validate_request
 
 try:
@@ -17,6 +20,46 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+METRICS_ENDPOINT = "https://westeurope.metrics.monitor.azure.com"
+# Monitor aggregates TextCharactersTranslated every few minutes, so a short-lived total is as good as a fresh query
+QUOTA_CACHE_SECONDS = int(os.getenv('AZURE_TRANSLATOR_QUOTA_CACHE_SECONDS', '300'))
+
+# Credential discovery and client setup are paid once per warm instance
+_credential = None
+_metrics_client = None
+_clients_lock = threading.Lock()
+_quota_cache = {}
+_quota_cache_lock = threading.Lock()
+
+
+def _get_credential():
+    global _credential
+    if _credential is None:
+        # Skip the developer-tool probes that never succeed in the Functions host; CLI stays for local runs
+        _credential = DefaultAzureCredential(
+            exclude_visual_studio_code_credential=True,
+            exclude_shared_token_cache_credential=True,
+            exclude_powershell_credential=True
+        )
+    return _credential
+
+
+def _get_metrics_client():
+    global _metrics_client
+    with _clients_lock:
+        if _metrics_client is None:
+            try:
+                from azure.monitor.querymetrics import MetricsClient
+                _metrics_client = MetricsClient(METRICS_ENDPOINT, _get_credential())
+            except ImportError:
+                try:
+                    from azure.monitor.query import MetricsQueryClient
+                except ImportError:
+                    logger.error("Neither azure-monitor-querymetrics nor azure-monitor-query available")
+                    raise ImportError("azure-monitor-querymetrics or azure-monitor-query package required")
+                _metrics_client = MetricsQueryClient(_get_credential())
+        return _metrics_client
+
 
 def _first_day_of_current_month(now: datetime, start_day: int) -> datetime:
     first_day = now.replace(day=start_day, hour=0, minute=0, second=0, microsecond=0)
@@ -40,13 +83,10 @@ def _get_total_characters(resource_id: str, billing_start: datetime, billing_end
         logger.error("Azure Monitor dependencies not available")
         raise ImportError("azure-identity package required")
     
-    credential = DefaultAzureCredential()
+    metrics_client = _get_metrics_client()
     
-    try:
-        from azure.monitor.querymetrics import MetricsClient, MetricAggregationType
-        region = "westeurope"
-        endpoint = f"https://{region}.metrics.monitor.azure.com"
-        metrics_client = MetricsClient(endpoint, credential)
+    if hasattr(metrics_client, 'query_resources'):
+        from azure.monitor.querymetrics import MetricAggregationType
         
         # Use tuple form (start_datetime, end_datetime) for timespan
         timespan = (billing_start, billing_end)
@@ -64,20 +104,14 @@ def _get_total_characters(resource_id: str, billing_start: datetime, billing_end
         )
         # query_resources returns a list, get first result
         response = response_list[0] if isinstance(response_list, list) and len(response_list) > 0 else response_list
-    except ImportError:
-        try:
-            from azure.monitor.query import MetricsQueryClient
-            metrics_client = MetricsQueryClient(credential)
-            response = metrics_client.query_resource(
-                resource_id=resource_id,
-                metric_names=["TextCharactersTranslated"],
-                start_time=billing_start,
-                end_time=billing_end,
-                aggregation="Total"
-            )
-        except ImportError:
-            logger.error("Neither azure-monitor-querymetrics nor azure-monitor-query available")
-            raise ImportError("azure-monitor-querymetrics or azure-monitor-query package required")
+    else:
+        response = metrics_client.query_resource(
+            resource_id=resource_id,
+            metric_names=["TextCharactersTranslated"],
+            start_time=billing_start,
+            end_time=billing_end,
+            aggregation="Total"
+        )
     
     total_chars = 0
     if hasattr(response, 'metrics'):
@@ -102,6 +136,22 @@ def _get_total_characters(resource_id: str, billing_start: datetime, billing_end
     return total_chars
 
 
+def _get_total_characters_cached(resource_id: str, billing_start: datetime, billing_end: datetime) -> int:
+    key = (resource_id, billing_start)
+    now = time.monotonic()
+    with _quota_cache_lock:
+        cached = _quota_cache.get(key)
+    if cached is not None and now - cached[0] < QUOTA_CACHE_SECONDS:
+        return cached[1]
+    
+    total_chars = _get_total_characters(resource_id, billing_start, billing_end)
+    with _quota_cache_lock:
+        # A new billing period gets a new key; the previous period's total is never asked for again
+        _quota_cache.clear()
+        _quota_cache[key] = (now, total_chars)
+    return total_chars
+
+
 @app.route(route="translator-quota", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET"])
 def translator_quota(req: func.HttpRequest) -> func.HttpResponse:
     logger.info('Translator Quota function triggered')
@@ -110,7 +160,7 @@ def translator_quota(req: func.HttpRequest) -> func.HttpResponse:
     if not is_valid:
         logger.warning(f"Authentication failed: {username_or_error}")
         return func.HttpResponse(
-            json.dumps({"error": "Authentication required"}),
+            json_dumps({"error": "Authentication required"}),
             status_code=401,
             mimetype="application/json"
         )
@@ -119,7 +169,7 @@ def translator_quota(req: func.HttpRequest) -> func.HttpResponse:
     if not resource_id:
         logger.error("AZURE_TRANSLATOR_RESOURCE_ID not configured")
         return func.HttpResponse(
-            json.dumps({"error": "Translator resource ID not configured"}),
+            json_dumps({"error": "Translator resource ID not configured"}),
             status_code=500,
             mimetype="application/json"
         )
@@ -132,11 +182,11 @@ def translator_quota(req: func.HttpRequest) -> func.HttpResponse:
     billing_end = now
     
     try:
-        total_chars = _get_total_characters(resource_id, billing_start, billing_end)
+        total_chars = _get_total_characters_cached(resource_id, billing_start, billing_end)
     except Exception as e:
         logger.error(f"Error querying translator quota: {e}")
         return func.HttpResponse(
-            json.dumps({"error": f"Failed to query quota: {str(e)}"}),
+            json_dumps({"error": f"Failed to query quota: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
         )
@@ -157,7 +207,7 @@ def translator_quota(req: func.HttpRequest) -> func.HttpResponse:
     }
     
     return func.HttpResponse(
-        json.dumps(result),
+        json_dumps(result),
         status_code=200,
         mimetype="application/json"
     )
@@ -134,6 +134,53 @@ else
 fi
 log ""
 
+# Lifecycle rule: the storage service deletes translation cache blobs by age, so stale entries
+# are removed even when no function instance runs its cleanup sweep
+TRANSLATION_CACHE_RETENTION_DAYS="${TRANSLATION_CACHE_RETENTION_DAYS:-2}"
+log "Configuring lifecycle policy for translation cache (${TRANSLATION_CACHE_RETENTION_DAYS} days)..."
+RULE_FILE=$(mktemp)
+POLICY_FILE=$(mktemp)
+cat > "$RULE_FILE" <<EOF
+{
+  "enabled": true,
+  "name": "expire-translation-cache",
+  "type": "Lifecycle",
+  "definition": {
+    "filters": {
+      "blobTypes": ["blockBlob"],
+      "prefixMatch": ["${STORAGE_CONTAINER}/cache/translations/"]
+    },
+    "actions": {
+      "baseBlob": {
+        "delete": {"daysAfterModificationGreaterThan": ${TRANSLATION_CACHE_RETENTION_DAYS}}
+      }
+    }
+  }
+}
+EOF
+# management-policy create replaces the whole policy, so merge into any existing one to keep its other rules
+EXISTING_POLICY=$(az storage account management-policy show \
+    --account-name "$STORAGE_ACCOUNT_NAME" \
+    --resource-group "$RESOURCE_GROUP" \
+    --query policy -o json 2>/dev/null || true)
+if [ -n "$EXISTING_POLICY" ]; then
+    log "Existing lifecycle policy found; merging rule 'expire-translation-cache' into it."
+fi
+EXISTING_POLICY="$EXISTING_POLICY" python3 - "$RULE_FILE" "$POLICY_FILE" <<'PY'
+import json, os, sys
+rule = json.load(open(sys.argv[1]))
+policy = json.loads(os.environ.get('EXISTING_POLICY') or 'null') or {}
+policy['rules'] = [r for r in policy.get('rules') or [] if r.get('name') != rule['name']] + [rule]
+json.dump(policy, open(sys.argv[2], 'w'), indent=2)
+PY
+az storage account management-policy create \
+    --account-name "$STORAGE_ACCOUNT_NAME" \
+    --resource-group "$RESOURCE_GROUP" \
+    --policy @"$POLICY_FILE" >> "$LOG_FILE" 2>&1
+rm -f "$RULE_FILE" "$POLICY_FILE"
+log "Lifecycle policy configured."
+log ""
+
 # Create Translator Cognitive Service
 # Commented out - user already has translator service
 # Uncomment if you need to create a new translator service
@@ -180,6 +227,7 @@ log "Resource Group: $RESOURCE_GROUP"
 log "Storage Account: $STORAGE_ACCOUNT_NAME"
 log "Storage Container: $STORAGE_CONTAINER"
 log "Table Storage: $RATE_LIMIT_TABLE_NAME"
+log "Translation cache retention: $TRANSLATION_CACHE_RETENTION_DAYS days"
 log "Translator: $TRANSLATOR_NAME"
 log ""
 log "Connection String (for AzureWebJobsStorage):"